@@ -0,0 +1,41 @@
+"""add partial index for due reminders
+
+Revision ID: 20261015_0000
+Revises: 20251219_0000
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261015_0000'
+down_revision: Union[str, None] = '20251219_0000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Replace the (is_triggered, reminder_time) index with a partial index
+
+    The catch-up job only ever looks at pending reminders, so indexing
+    reminder_time WHERE is_triggered = false keeps the index limited to
+    the hot rows instead of the whole (mostly triggered) history.
+    """
+    op.drop_index('ix_reminders_due', table_name='reminders')
+    op.create_index(
+        'ix_reminders_due_pending',
+        'reminders',
+        ['reminder_time'],
+        postgresql_where=sa.text('is_triggered = false')
+    )
+
+
+def downgrade() -> None:
+    """Restore the full (is_triggered, reminder_time) index"""
+    op.drop_index('ix_reminders_due_pending', table_name='reminders')
+    op.create_index('ix_reminders_due', 'reminders', ['is_triggered', 'reminder_time'])
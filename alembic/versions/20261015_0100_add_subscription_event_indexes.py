@@ -0,0 +1,46 @@
+"""add subscription event lookup indexes
+
+Revision ID: 20261015_0100
+Revises: 20261015_0000
+Create Date: 2026-10-15 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261015_0100'
+down_revision: Union[str, None] = '20261015_0000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add indexes for subscription event lookups
+
+    - purchase_token: webhook/verification lookups by token
+    - (user_id, verified_at DESC) INCLUDE (product_id): covering index for
+      the "latest event for user" query in get_subscription_status, so it
+      reads one index entry instead of sorting all of the user's events
+    """
+    op.create_index(
+        'ix_subscription_events_purchase_token',
+        'subscription_events',
+        ['purchase_token']
+    )
+    op.create_index(
+        'ix_subscription_events_user_latest',
+        'subscription_events',
+        ['user_id', sa.text('verified_at DESC')],
+        postgresql_include=['product_id']
+    )
+
+
+def downgrade() -> None:
+    """Drop subscription event lookup indexes"""
+    op.drop_index('ix_subscription_events_user_latest', table_name='subscription_events')
+    op.drop_index('ix_subscription_events_purchase_token', table_name='subscription_events')
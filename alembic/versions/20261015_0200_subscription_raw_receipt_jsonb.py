@@ -0,0 +1,48 @@
+"""store subscription_events.raw_receipt as JSONB
+
+Revision ID: 20261015_0200
+Revises: 20261015_0100
+Create Date: 2026-10-15 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261015_0200'
+down_revision: Union[str, None] = '20261015_0100'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Convert raw_receipt from TEXT to JSONB
+
+    Existing values were written with str(dict) (Python repr, not JSON),
+    so they are kept verbatim as JSON strings rather than parsed.
+    """
+    op.alter_column(
+        'subscription_events',
+        'raw_receipt',
+        type_=JSONB(),
+        existing_type=sa.Text(),
+        existing_nullable=True,
+        postgresql_using='to_jsonb(raw_receipt)'
+    )
+
+
+def downgrade() -> None:
+    """Convert raw_receipt back to TEXT (JSON strings are unwrapped)"""
+    op.alter_column(
+        'subscription_events',
+        'raw_receipt',
+        type_=sa.Text(),
+        existing_type=JSONB(),
+        existing_nullable=True,
+        postgresql_using="raw_receipt #>> '{}'"
+    )
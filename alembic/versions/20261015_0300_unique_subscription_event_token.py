@@ -0,0 +1,64 @@
+"""unique subscription event per purchase token and type
+
+Revision ID: 20261015_0300
+Revises: 20261015_0200
+Create Date: 2026-10-15 03:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261015_0300'
+down_revision: Union[str, None] = '20261015_0200'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Make (purchase_token, event_type) unique on subscription_events
+
+    Repeated verifications of the same purchase used to append one row per
+    call. Keep only the most recent row for each (purchase_token, event_type),
+    then add the unique constraint that the verification upsert targets.
+    Its index leads with purchase_token, so the plain purchase_token index
+    becomes redundant and is dropped.
+
+    Rows without a purchase_token (webhook events) are not affected.
+    """
+    op.execute(sa.text("""
+        DELETE FROM subscription_events
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY purchase_token, event_type
+                           ORDER BY verified_at DESC, id
+                       ) AS rn
+                FROM subscription_events
+                WHERE purchase_token IS NOT NULL
+            ) ranked
+            WHERE ranked.rn > 1
+        )
+    """))
+
+    op.create_unique_constraint(
+        'uq_subscription_event_token_type',
+        'subscription_events',
+        ['purchase_token', 'event_type']
+    )
+    op.drop_index('ix_subscription_events_purchase_token', table_name='subscription_events')
+
+
+def downgrade() -> None:
+    """Drop the unique constraint and restore the purchase_token index (removed rows are not restored)"""
+    op.create_index(
+        'ix_subscription_events_purchase_token',
+        'subscription_events',
+        ['purchase_token']
+    )
+    op.drop_constraint('uq_subscription_event_token_type', 'subscription_events', type_='unique')
@@ -0,0 +1,65 @@
+"""add purchase token lookup indexes
+
+Revision ID: 20261015_0400
+Revises: 20261015_0300
+Create Date: 2026-10-15 04:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261015_0400'
+down_revision: Union[str, None] = '20261015_0300'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add partial indexes for webhook lookups by purchase token
+
+    - users.google_play_purchase_token: unique where not null, so a token
+      maps to at most one user. If a token is currently stored on several
+      users, it is kept on the one whose subscription expires last and
+      cleared on the others.
+    - devices.last_purchase_token: non-unique, where not null
+    """
+    op.execute(sa.text("""
+        UPDATE users SET google_play_purchase_token = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY google_play_purchase_token
+                           ORDER BY subscription_expires_at DESC NULLS LAST, created_at DESC
+                       ) AS rn
+                FROM users
+                WHERE google_play_purchase_token IS NOT NULL
+            ) ranked
+            WHERE ranked.rn > 1
+        )
+    """))
+
+    op.create_index(
+        'ix_users_google_play_purchase_token',
+        'users',
+        ['google_play_purchase_token'],
+        unique=True,
+        postgresql_where=sa.text('google_play_purchase_token IS NOT NULL')
+    )
+    op.create_index(
+        'ix_devices_last_purchase_token',
+        'devices',
+        ['last_purchase_token'],
+        postgresql_where=sa.text('last_purchase_token IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    """Drop purchase token lookup indexes (cleared duplicate tokens are not restored)"""
+    op.drop_index('ix_devices_last_purchase_token', table_name='devices')
+    op.drop_index('ix_users_google_play_purchase_token', table_name='users')
@@ -0,0 +1,38 @@
+"""add reminders sync key index
+
+Revision ID: 20261015_0500
+Revises: 20261015_0400
+Create Date: 2026-10-15 05:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261015_0500'
+down_revision: Union[str, None] = '20261015_0400'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add composite index on reminders (user_id, note_uuid, occurrence_number)
+
+    sync_reminders looks up all incoming occurrences with
+    (note_uuid, occurrence_number) IN (...) for one user; this index
+    matches that predicate exactly instead of filtering the user's rows.
+    """
+    op.create_index(
+        'ix_reminders_sync_key',
+        'reminders',
+        ['user_id', 'note_uuid', 'occurrence_number']
+    )
+
+
+def downgrade() -> None:
+    """Drop reminders sync key index"""
+    op.drop_index('ix_reminders_sync_key', table_name='reminders')
@@ -0,0 +1,39 @@
+"""add encrypted notes sync index
+
+Revision ID: 20261015_0600
+Revises: 20261015_0500
+Create Date: 2026-10-15 06:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261015_0600'
+down_revision: Union[str, None] = '20261015_0500'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add partial index on encrypted_notes (user_id, updated_at) for live notes
+
+    Incremental sync (GET /notes/sync?since=...) filters a user's
+    non-deleted notes by updated_at; previously only user_id was
+    indexed, so every changed-since query scanned all of the user's notes.
+    """
+    op.create_index(
+        'ix_encrypted_notes_sync',
+        'encrypted_notes',
+        ['user_id', 'updated_at'],
+        postgresql_where=sa.text('is_deleted = false')
+    )
+
+
+def downgrade() -> None:
+    """Drop encrypted notes sync index"""
+    op.drop_index('ix_encrypted_notes_sync', table_name='encrypted_notes')
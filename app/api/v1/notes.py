@@ -2,6 +2,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List
+from binascii import b2a_base64
 from app.database import get_db
 from app.schemas.note import (
     EncryptedNoteResponse,
@@ -39,12 +40,21 @@ async def get_notes_for_sync(
         include_deleted=include_deleted
     )
 
-    # Convert encrypted_data to base64
-    import base64
-    for note in notes:
-        note.encrypted_data = base64.b64encode(note.encrypted_data).decode('utf-8')
-
-    return notes
+    # Convert encrypted_data to base64 in plain response dicts, rather than
+    # overwriting the attribute on ORM objects still attached to the session
+    return [
+        {
+            "id": note.id,
+            "client_note_uuid": note.client_note_uuid,
+            "encrypted_data": b2a_base64(note.encrypted_data, newline=False).decode('ascii'),
+            "note_metadata": note.note_metadata,
+            "version": note.version,
+            "created_at": note.created_at,
+            "updated_at": note.updated_at,
+            "is_deleted": note.is_deleted,
+        }
+        for note in notes
+    ]
 
 
 @router.post("/sync", response_model=NoteSyncResponse)
@@ -4,7 +4,7 @@ Webhook endpoints for external service notifications
 Handles:
 - Google Play Real-Time Developer Notifications (RTDN) via Cloud Pub/Sub
 """
-from fastapi import APIRouter, Depends, HTTPException, Request, Header
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Header
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.webhook_service import WebhookService
@@ -22,6 +22,7 @@ router = APIRouter()
 @router.post("/google-play")
 async def google_play_webhook(
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     authorization: Optional[str] = Header(None)
 ):
@@ -43,7 +44,9 @@ async def google_play_webhook(
     - Grace periods
     - Expirations
 
-    Returns 200 OK to acknowledge receipt (prevents Pub/Sub retries)
+    Returns 200 OK to acknowledge receipt (prevents Pub/Sub retries).
+    State changes are committed before responding; follow-up pushes to the
+    user's devices are sent after the response.
     """
     try:
         # Get the raw body
@@ -67,7 +70,7 @@ async def google_play_webhook(
                     raise HTTPException(status_code=401, detail="Invalid verification token")
 
         # Process the notification
-        webhook_service = WebhookService(db)
+        webhook_service = WebhookService(db, background_tasks)
         result = await webhook_service.process_google_play_notification(body)
 
         if result.get('success'):
@@ -48,6 +48,11 @@ class Settings(BaseSettings):
     # Firebase Cloud Messaging
     FCM_CREDENTIALS_PATH: str = "firebase-admin-sdk.json"
 
+    # Reminder scheduler
+    # Reminder jobs spend nearly all their time waiting on the DB and FCM,
+    # so they can run many at once without competing for CPU
+    REMINDER_WORKER_THREADS: int = 50
+
     # Firebase Authentication
     FIREBASE_PROJECT_ID: str
     FIREBASE_AUTH_ENABLED: bool = False
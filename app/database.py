@@ -5,6 +5,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from functools import partial
+import json
 
 # Create database engine
 engine = create_engine(
@@ -12,6 +14,13 @@ engine = create_engine(
     pool_pre_ping=True,
     pool_size=10,
     max_overflow=20,
+    # psycopg2: batch executemany UPDATE/DELETE (bulk note sync, reminder
+    # updates) into pages instead of one round trip per row; INSERTs
+    # already use multi-row VALUES
+    executemany_mode="values_plus_batch",
+    # JSONB parameters (note metadata, receipts) are parsed by Postgres, so
+    # skip the whitespace json.dumps adds by default
+    json_serializer=partial(json.dumps, separators=(",", ":")),
     echo=settings.DEBUG
 )
 
@@ -99,6 +99,10 @@ async def shutdown_event():
     from app.scheduler import stop_scheduler
     stop_scheduler()
 
+    # Close pooled Google Play API connections
+    from app.services.google_play_client import close_google_play_client
+    await close_google_play_client()
+
 
 # Health check endpoint
 @app.get("/health")
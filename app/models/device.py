@@ -1,5 +1,5 @@
 """Device model for device-based subscriptions"""
-from sqlalchemy import Column, String, Integer, DateTime, Boolean
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime, timedelta
 from typing import Optional
@@ -36,6 +36,15 @@ class Device(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # Webhook lookup by purchase token (most devices never purchase)
+        Index(
+            'ix_devices_last_purchase_token',
+            'last_purchase_token',
+            postgresql_where=text('last_purchase_token IS NOT NULL')
+        ),
+    )
+
     def is_in_grace_period(self) -> bool:
         """Check if device is in grace period (payment failed but still has access)"""
         if self.grace_period_ends_at:
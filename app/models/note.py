@@ -1,5 +1,5 @@
 """Note and sync models"""
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, LargeBinary
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, LargeBinary, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -41,6 +41,15 @@ class EncryptedNote(Base):
     # Relationships
     user = relationship("User", back_populates="notes")
 
+    __table_args__ = (
+        # Incremental sync: a user's live notes changed since a timestamp
+        Index(
+            'ix_encrypted_notes_sync',
+            'user_id', 'updated_at',
+            postgresql_where=text('is_deleted = false')
+        ),
+    )
+
     def __repr__(self):
         return f"<EncryptedNote(id={self.id}, user_id={self.user_id}, client_id={self.client_note_id})>"
 
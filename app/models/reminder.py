@@ -1,5 +1,5 @@
 """Reminder model for backend-scheduled notifications"""
-from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, Index, Integer, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, Index, Integer, Enum as SQLEnum, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -82,7 +82,10 @@ class Reminder(Base):
     # Composite indexes for efficient queries
     __table_args__ = (
         Index('ix_reminders_user_pending', 'user_id', 'is_triggered', 'reminder_time'),
-        Index('ix_reminders_due', 'is_triggered', 'reminder_time'),
+        # Client sync key: (note_uuid, occurrence_number) identifies an occurrence per user
+        Index('ix_reminders_sync_key', 'user_id', 'note_uuid', 'occurrence_number'),
+        # Partial index: only pending rows, so the catch-up scan never touches triggered history
+        Index('ix_reminders_due_pending', 'reminder_time', postgresql_where=text('is_triggered = false')),
     )
 
     def is_due(self) -> bool:
@@ -1,6 +1,6 @@
 """Subscription and payment models"""
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -27,11 +27,25 @@ class SubscriptionEvent(Base):
     verified_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     expires_at = Column(DateTime, nullable=True)
 
-    # Raw receipt data (for debugging)
-    raw_receipt = Column(Text, nullable=True)
+    # Raw receipt data (for debugging): Google Play response object, or a marker string
+    raw_receipt = Column(JSONB, nullable=True)
 
     # Relationships
     user = relationship("User", back_populates="subscription_events")
 
+    __table_args__ = (
+        # One row per purchase token and event type: re-verifying a purchase
+        # refreshes the existing row instead of appending a new one. Also serves
+        # lookups by purchase_token.
+        UniqueConstraint('purchase_token', 'event_type', name='uq_subscription_event_token_type'),
+        # Latest event per user (ORDER BY verified_at DESC LIMIT 1) as an index-only scan
+        Index(
+            'ix_subscription_events_user_latest',
+            user_id,
+            verified_at.desc(),
+            postgresql_include=['product_id']
+        ),
+    )
+
     def __repr__(self):
         return f"<SubscriptionEvent(id={self.id}, user_id={self.user_id}, type={self.event_type})>"
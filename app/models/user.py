@@ -1,5 +1,5 @@
 """User model"""
-from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -52,6 +52,16 @@ class User(Base):
     usage_tracking = relationship("UsageTracking", back_populates="user", cascade="all, delete-orphan", uselist=False)
     reminders = relationship("Reminder", back_populates="user", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Webhook lookup by purchase token; a token belongs to at most one user
+        Index(
+            'ix_users_google_play_purchase_token',
+            'google_play_purchase_token',
+            unique=True,
+            postgresql_where=text('google_play_purchase_token IS NOT NULL')
+        ),
+    )
+
     @property
     def is_premium(self) -> bool:
         """Check if user has active premium subscription or in grace period"""
@@ -1,14 +1,23 @@
 """Simple reminder scheduler using APScheduler"""
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.triggers.date import DateTrigger
+from apscheduler.jobstores.base import JobLookupError
 from datetime import datetime
+from typing import List, Optional, Tuple
 import logging
 from sqlalchemy.orm import Session
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
-# Global scheduler instance
-scheduler = BackgroundScheduler(timezone="UTC")
+# Global scheduler instance. Reminder jobs are I/O-bound (DB + FCM), so the
+# default 10-thread pool would queue due reminders behind slow sends.
+scheduler = BackgroundScheduler(
+    timezone="UTC",
+    executors={"default": ThreadPoolExecutor(settings.REMINDER_WORKER_THREADS)},
+)
 
 
 def start_scheduler():
@@ -39,6 +48,9 @@ def start_scheduler():
             print("✅ Added periodic check job")
             logger.info("✅ Added periodic missed reminder check (every 5 minutes)")
 
+            # Jobs live in memory only - re-create them for pending reminders
+            restore_pending_reminders()
+
             # Log all existing jobs
             jobs = scheduler.get_jobs()
             print(f"📋 Total jobs in scheduler: {len(jobs)}")
@@ -68,6 +80,11 @@ def stop_scheduler():
         logger.info("👋 Reminder scheduler stopped")
 
 
+def get_job_id(reminder_id) -> str:
+    """Get the scheduler job ID for a reminder (deterministic, so it can be stored before scheduling)"""
+    return f"reminder_{reminder_id}"
+
+
 def schedule_reminder(reminder_id: str, reminder_time: datetime):
     """
     Schedule a reminder to be sent at a specific time
@@ -96,7 +113,7 @@ def schedule_reminder(reminder_id: str, reminder_time: datetime):
             send_reminder_notification,
             trigger=DateTrigger(run_date=reminder_time),
             args=[reminder_id],
-            id=f"reminder_{reminder_id}",
+            id=get_job_id(reminder_id),
             replace_existing=True,
             misfire_grace_time=300,  # Allow up to 5 minutes late execution
         )
@@ -115,20 +132,127 @@ def schedule_reminder(reminder_id: str, reminder_time: datetime):
         raise
 
 
+def schedule_reminders(reminders: List[Tuple[str, datetime]]) -> List[Optional[str]]:
+    """
+    Schedule a batch of reminders in a single pass
+
+    Unlike calling schedule_reminder() in a loop, this skips the per-job
+    diagnostics (including the full job listing) and logs one summary line.
+
+    Args:
+        reminders: (reminder_id, reminder_time) pairs
+
+    Returns:
+        Job IDs in input order (None for reminders that failed to schedule)
+    """
+    from app.tasks.reminder_tasks import send_reminder_notification
+
+    job_ids = []
+    for reminder_id, reminder_time in reminders:
+        try:
+            job = scheduler.add_job(
+                send_reminder_notification,
+                trigger=DateTrigger(run_date=reminder_time),
+                args=[reminder_id],
+                id=get_job_id(reminder_id),
+                replace_existing=True,
+                misfire_grace_time=300,  # Allow up to 5 minutes late execution
+            )
+            job_ids.append(job.id)
+        except Exception as e:
+            logger.error(f"❌ Failed to schedule reminder {reminder_id}: {e}")
+            job_ids.append(None)
+
+    scheduled = sum(1 for job_id in job_ids if job_id)
+    logger.info(f"✅ Scheduled {scheduled}/{len(job_ids)} reminder(s) in batch")
+
+    return job_ids
+
+
+def restore_pending_reminders() -> int:
+    """
+    Schedule jobs for all pending future reminders
+
+    The reminders table is the durable record of what needs scheduling:
+    reminders are committed first and scheduled afterwards, and the job
+    store is in-memory. Anything not scheduled in this process (restart,
+    or a failure after commit) is re-created here on startup. Overdue
+    reminders are left to the periodic missed-reminder check.
+
+    Returns:
+        Number of reminders scheduled
+    """
+    from app.database import SessionLocal
+    from app.models.reminder import Reminder
+
+    db = SessionLocal()
+    try:
+        pending = db.query(Reminder.id, Reminder.reminder_time).filter(
+            Reminder.is_triggered == False,
+            Reminder.reminder_time > datetime.utcnow()
+        ).all()
+    except Exception as e:
+        logger.error(f"❌ Failed to load pending reminders: {e}")
+        return 0
+    finally:
+        db.close()
+
+    if not pending:
+        return 0
+
+    job_ids = schedule_reminders(
+        [(str(reminder_id), reminder_time) for reminder_id, reminder_time in pending]
+    )
+    return sum(1 for job_id in job_ids if job_id)
+
+
 def cancel_reminder(job_id: str):
     """
     Cancel a scheduled reminder
 
+    Cancellation is best-effort: send_reminder_notification re-checks the
+    reminder in the database before sending, so a job that already ran (or
+    was never scheduled here) needs no further handling.
+
     Args:
         job_id: Job ID to cancel
     """
     try:
         scheduler.remove_job(job_id)
         logger.info(f"❌ Cancelled reminder job {job_id}")
+    except JobLookupError:
+        logger.debug(f"Reminder job {job_id} not scheduled, nothing to cancel")
     except Exception as e:
         logger.warning(f"Failed to cancel job {job_id}: {e}")
 
 
+def cancel_reminders(job_ids: List[str]) -> int:
+    """
+    Cancel a batch of scheduled reminders in a single pass
+
+    Best-effort like cancel_reminder(); jobs that are no longer scheduled
+    are skipped. Logs one summary line instead of one per job.
+
+    Args:
+        job_ids: Job IDs to cancel
+
+    Returns:
+        Number of jobs cancelled
+    """
+    cancelled = 0
+    for job_id in job_ids:
+        try:
+            scheduler.remove_job(job_id)
+            cancelled += 1
+        except JobLookupError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to cancel job {job_id}: {e}")
+
+    logger.info(f"❌ Cancelled {cancelled}/{len(job_ids)} reminder job(s) in batch")
+    return cancelled
+
+
 def check_missed_reminders():
     """
     Check for reminders that should have been sent but weren't
@@ -71,7 +71,7 @@ class ReminderCreate(BaseModel):
         elif end_type == RecurrenceEndTypeEnum.ON_DATE:
             # Should be a valid ISO date
             try:
-                datetime.fromisoformat(v.replace('Z', '+00:00'))
+                datetime.fromisoformat(v)
             except ValueError:
                 raise ValueError('recurrence_end_value must be a valid ISO date string for ON_DATE')
 
@@ -155,9 +155,9 @@ class ReminderSyncItem(BaseModel):
     recurrence_interval: int = 1
     recurrence_end_type: str = "never"
     recurrence_end_value: Optional[str] = None
-    parent_reminder_id: Optional[str] = None
+    parent_reminder_id: Optional[UUID] = None
     occurrence_number: int = 1
-    series_id: Optional[str] = None
+    series_id: Optional[UUID] = None
 
 
 class ReminderSyncRequest(BaseModel):
@@ -0,0 +1,124 @@
+"""Async client for the Google Play Developer (Android Publisher) API"""
+from app.config import settings
+from typing import Optional, Dict
+from urllib.parse import quote
+import asyncio
+import os
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+ANDROID_PUBLISHER_SCOPE = "https://www.googleapis.com/auth/androidpublisher"
+ANDROID_PUBLISHER_BASE_URL = "https://androidpublisher.googleapis.com/androidpublisher/v3"
+
+
+class GooglePlayClient:
+    """
+    Thin async wrapper around the Android Publisher REST API
+
+    Keeps a pool of keep-alive connections to androidpublisher.googleapis.com
+    (so the TLS handshake is paid once, not per verification) and reuses the
+    service account access token until it expires.
+    """
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.http = httpx.AsyncClient(
+            base_url=ANDROID_PUBLISHER_BASE_URL,
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(
+                max_connections=20,
+                max_keepalive_connections=20,
+                keepalive_expiry=300
+            )
+        )
+
+    async def _get_access_token(self, force_refresh: bool = False) -> str:
+        """Return a cached access token, refreshing it only when expired or rejected"""
+        if force_refresh or not self.credentials.valid:
+            from google.auth.transport.requests import Request
+
+            # Token refresh is a blocking HTTP call; it happens about once an hour
+            await asyncio.to_thread(self.credentials.refresh, Request())
+
+        return self.credentials.token
+
+    async def get_subscription(
+        self,
+        package_name: str,
+        subscription_id: str,
+        purchase_token: str
+    ) -> Dict:
+        """
+        Get a subscription purchase (purchases.subscriptions.get)
+
+        Args:
+            package_name: Android package name
+            subscription_id: Subscription product ID
+            purchase_token: Purchase token from Google Play
+
+        Returns:
+            SubscriptionPurchase resource as a dict
+
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        path = (
+            f"/applications/{quote(package_name, safe='')}"
+            f"/purchases/subscriptions/{quote(subscription_id, safe='')}"
+            f"/tokens/{quote(purchase_token, safe='')}"
+        )
+
+        token = await self._get_access_token()
+        response = await self.http.get(path, headers={"Authorization": f"Bearer {token}"})
+
+        if response.status_code == 401:
+            # Token revoked or expired early - refresh once and retry
+            token = await self._get_access_token(force_refresh=True)
+            response = await self.http.get(path, headers={"Authorization": f"Bearer {token}"})
+
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        await self.http.aclose()
+
+
+# Process-wide client (connections and access token are shared across requests)
+_client: Optional[GooglePlayClient] = None
+
+
+def get_google_play_client() -> Optional[GooglePlayClient]:
+    """
+    Get the shared Google Play client
+
+    Returns:
+        GooglePlayClient, or None if no service account is configured
+    """
+    global _client
+
+    if _client is None and os.path.exists(settings.GOOGLE_PLAY_SERVICE_ACCOUNT_PATH):
+        try:
+            from google.oauth2 import service_account
+
+            credentials = service_account.Credentials.from_service_account_file(
+                settings.GOOGLE_PLAY_SERVICE_ACCOUNT_PATH,
+                scopes=[ANDROID_PUBLISHER_SCOPE]
+            )
+            _client = GooglePlayClient(credentials)
+        except Exception as e:
+            logger.warning(f"Could not initialize Google Play service: {e}")
+
+    return _client
+
+
+async def close_google_play_client() -> None:
+    """Close the shared Google Play client (called on shutdown)"""
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
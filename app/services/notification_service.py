@@ -2,41 +2,68 @@
 from sqlalchemy.orm import Session
 from app.models.notification import FCMToken
 from app.config import settings
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+import asyncio
 import os
 
 
+# Most tokens FCM accepts in one multicast send
+FCM_MULTICAST_LIMIT = 500
+
+# Process-wide Firebase app, initialized by the first NotificationService
+_firebase_app = None
+
+
+def _get_firebase_app():
+    """
+    Get the Firebase app, initializing the Admin SDK on first use
+
+    Credentials are loaded once per process; later NotificationService
+    instances (one per request or reminder job) reuse the app.
+
+    Raises:
+        FileNotFoundError: If the credentials file does not exist
+        RuntimeError: If the Admin SDK fails to initialize
+    """
+    global _firebase_app
+
+    if _firebase_app is not None:
+        return _firebase_app
+
+    # Initialize Firebase if credentials exist
+    if os.path.exists(settings.FCM_CREDENTIALS_PATH):
+        try:
+            import firebase_admin
+            from firebase_admin import credentials
+
+            if not firebase_admin._apps:
+                cred = credentials.Certificate(settings.FCM_CREDENTIALS_PATH)
+                _firebase_app = firebase_admin.initialize_app(cred)
+                print(f"✅ Firebase Admin SDK initialized successfully")
+            else:
+                _firebase_app = firebase_admin.get_app()
+                print(f"✅ Using existing Firebase Admin SDK instance")
+        except Exception as e:
+            print(f"❌ Error: Could not initialize Firebase Admin SDK: {e}")
+            raise RuntimeError(f"Firebase initialization failed: {e}")
+    else:
+        print(f"❌ Warning: Firebase credentials not found at {settings.FCM_CREDENTIALS_PATH}")
+        print(f"⚠️  Push notifications and Firebase authentication will not work!")
+        raise FileNotFoundError(
+            f"Firebase Admin SDK credentials file not found: {settings.FCM_CREDENTIALS_PATH}\n"
+            f"Please download credentials from Firebase Console and place at the specified path.\n"
+            f"See CREDENTIALS_SETUP_GUIDE.md for instructions."
+        )
+
+    return _firebase_app
+
+
 class NotificationService:
     """Service for handling push notifications"""
 
     def __init__(self, db: Session):
         self.db = db
-        self.firebase_app = None
-
-        # Initialize Firebase if credentials exist
-        if os.path.exists(settings.FCM_CREDENTIALS_PATH):
-            try:
-                import firebase_admin
-                from firebase_admin import credentials
-
-                if not firebase_admin._apps:
-                    cred = credentials.Certificate(settings.FCM_CREDENTIALS_PATH)
-                    self.firebase_app = firebase_admin.initialize_app(cred)
-                    print(f"✅ Firebase Admin SDK initialized successfully")
-                else:
-                    self.firebase_app = firebase_admin.get_app()
-                    print(f"✅ Using existing Firebase Admin SDK instance")
-            except Exception as e:
-                print(f"❌ Error: Could not initialize Firebase Admin SDK: {e}")
-                raise RuntimeError(f"Firebase initialization failed: {e}")
-        else:
-            print(f"❌ Warning: Firebase credentials not found at {settings.FCM_CREDENTIALS_PATH}")
-            print(f"⚠️  Push notifications and Firebase authentication will not work!")
-            raise FileNotFoundError(
-                f"Firebase Admin SDK credentials file not found: {settings.FCM_CREDENTIALS_PATH}\n"
-                f"Please download credentials from Firebase Console and place at the specified path.\n"
-                f"See CREDENTIALS_SETUP_GUIDE.md for instructions."
-            )
+        self.firebase_app = _get_firebase_app()
 
     async def register_fcm_token(
         self,
@@ -121,6 +148,10 @@ class NotificationService:
         """
         Send push notification to a specific device
 
+        firebase_admin keeps one messaging client (and its pooled HTTP
+        session) per Firebase app, so repeated sends reuse connections to
+        FCM; nothing here needs its own HTTP client.
+
         Args:
             fcm_token: FCM token
             title: Notification title
@@ -150,7 +181,9 @@ class NotificationService:
                 token=fcm_token
             )
 
-            response = messaging.send(message)
+            # messaging.send is a blocking HTTP call; run it off the event loop
+            # so concurrent sends (and other requests) aren't serialized behind it
+            response = await asyncio.to_thread(messaging.send, message)
 
             return {
                 "success": True,
@@ -164,6 +197,80 @@ class NotificationService:
                 "message": f"Failed to send notification: {str(e)}"
             }
 
+    async def send_multicast(
+        self,
+        fcm_tokens: List[str],
+        title: str,
+        body: str,
+        data: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Send the same push notification to several devices
+
+        Uses FCM's multicast send (up to 500 tokens per call) instead of
+        one send per device.
+
+        Args:
+            fcm_tokens: FCM tokens
+            title: Notification title
+            body: Notification body
+            data: Optional data payload
+
+        Returns:
+            One result per token, in order (same shape as send_notification)
+        """
+        if not self.firebase_app:
+            # Mock notification for development
+            return [
+                {
+                    "success": True,
+                    "message_id": "MOCK_MESSAGE_ID",
+                    "message": "Notification sent (DEV MODE)"
+                }
+                for _ in fcm_tokens
+            ]
+
+        from firebase_admin import messaging
+
+        results = []
+        for start in range(0, len(fcm_tokens), FCM_MULTICAST_LIMIT):
+            tokens = fcm_tokens[start:start + FCM_MULTICAST_LIMIT]
+
+            try:
+                message = messaging.MulticastMessage(
+                    notification=messaging.Notification(
+                        title=title,
+                        body=body
+                    ),
+                    data=data or {},
+                    tokens=tokens
+                )
+
+                # Blocking HTTP call; run it off the event loop
+                batch = await asyncio.to_thread(messaging.send_each_for_multicast, message)
+
+            except Exception as e:
+                results.extend(
+                    {"success": False, "message": f"Failed to send notification: {str(e)}"}
+                    for _ in tokens
+                )
+                continue
+
+            for response in batch.responses:
+                if response.success:
+                    results.append({
+                        "success": True,
+                        "message_id": response.message_id,
+                        "message": "Notification sent successfully"
+                    })
+                else:
+                    results.append({
+                        "success": False,
+                        "message": f"Failed to send notification: {str(response.exception)}"
+                    })
+
+        return results
+
     async def send_notification_to_user(
         self,
         user_id: str,
@@ -194,21 +301,15 @@ class NotificationService:
                 "message": "No FCM tokens found for user"
             }
 
-        sent_count = 0
-        failed_count = 0
-
-        for token_record in tokens:
-            result = await self.send_notification(
-                fcm_token=token_record.fcm_token,
-                title=title,
-                body=body,
-                data=data
-            )
+        results = await self.send_multicast(
+            fcm_tokens=[token_record.fcm_token for token_record in tokens],
+            title=title,
+            body=body,
+            data=data
+        )
 
-            if result["success"]:
-                sent_count += 1
-            else:
-                failed_count += 1
+        sent_count = sum(1 for result in results if result["success"])
+        failed_count = len(results) - sent_count
 
         return {
             "success": True,
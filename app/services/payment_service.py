@@ -1,42 +1,55 @@
 """Payment and subscription service"""
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.models.device import Device
 from app.models.subscription import SubscriptionEvent
 from app.config import settings
+from app.services.google_play_client import get_google_play_client
 from datetime import datetime, timedelta
-from typing import Optional, Dict
-import os
+from typing import Optional, Dict, Union
+from uuid import UUID
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Subscription length by keyword in the product ID (e.g. 'pinpoint_premium_yearly',
+# 'pinpoint_premium_yearly_v2'), checked in order. None means the purchase never
+# expires. Shared with the RTDN webhook handlers.
+SUBSCRIPTION_DURATION_BY_KEYWORD: Dict[str, Optional[timedelta]] = {
+    'lifetime': None,
+    'yearly': timedelta(days=365),
+    'monthly': timedelta(days=30),
+}
+DEFAULT_SUBSCRIPTION_DURATION = timedelta(days=30)
+
+
+def _as_uuid(value) -> UUID:
+    """Coerce a str/UUID primary key so Session.get() can hit the identity map"""
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
+def get_subscription_duration(product_id: Optional[str]) -> Optional[timedelta]:
+    """Get subscription length for a product ID (None for lifetime)"""
+    if product_id:
+        for keyword, duration in SUBSCRIPTION_DURATION_BY_KEYWORD.items():
+            if keyword in product_id:
+                return duration
+
+    return DEFAULT_SUBSCRIPTION_DURATION
+
 
 class PaymentService:
     """Service for handling payments and subscriptions"""
 
     def __init__(self, db: Session):
         self.db = db
-        self.google_play_service = None
-
-        # Initialize Google Play service if credentials exist
-        if os.path.exists(settings.GOOGLE_PLAY_SERVICE_ACCOUNT_PATH):
-            try:
-                from google.oauth2 import service_account
-                from googleapiclient.discovery import build
-
-                credentials = service_account.Credentials.from_service_account_file(
-                    settings.GOOGLE_PLAY_SERVICE_ACCOUNT_PATH,
-                    scopes=['https://www.googleapis.com/auth/androidpublisher']
-                )
-
-                self.google_play_service = build(
-                    'androidpublisher',
-                    'v3',
-                    credentials=credentials
-                )
-            except Exception as e:
-                logger.warning(f"Could not initialize Google Play service: {e}")
+        # Shared client; None if Google Play credentials are not configured
+        self.google_play_client = get_google_play_client()
+        # Subscription status per user_id (services are created per request,
+        # so this lives exactly as long as the request)
+        self._status_cache: Dict[str, Dict] = {}
 
     async def verify_google_play_purchase(
         self,
@@ -55,17 +68,13 @@ class PaymentService:
         Returns:
             Dictionary with verification result
         """
-        if not self.google_play_service:
+        if not self.google_play_client:
             # For development: Mock verification
             return await self._mock_verify_purchase(user_id, purchase_token, product_id)
 
         try:
             # Verify with Google Play API
-            subscription = self.google_play_service.purchases().subscriptions().get(
-                packageName=settings.GOOGLE_PLAY_PACKAGE_NAME,
-                subscriptionId=product_id,
-                token=purchase_token
-            ).execute()
+            subscription = await self._fetch_google_play_subscription(product_id, purchase_token)
 
             # Extract expiry time
             expiry_time_millis = int(subscription.get('expiryTimeMillis', 0))
@@ -75,26 +84,23 @@ class PaymentService:
 
             if is_active:
                 # Update user's subscription
-                user = self.db.query(User).filter(User.id == user_id).first()
+                user = self.db.get(User, _as_uuid(user_id))
                 if not user:
                     return {"success": False, "message": "User not found"}
 
                 user.subscription_tier = 'premium'
                 user.subscription_expires_at = expiry_time
-                user.google_play_purchase_token = purchase_token
+                self._assign_purchase_token(user, purchase_token)
+                self._status_cache.pop(str(user_id), None)
 
                 # Log subscription event
-                subscription_event = SubscriptionEvent(
+                self._log_subscription_event(
                     user_id=user_id,
-                    event_type='purchase',
                     purchase_token=purchase_token,
                     product_id=product_id,
-                    platform='android',
                     expires_at=expiry_time,
-                    raw_receipt=str(subscription)
+                    raw_receipt=subscription
                 )
-
-                self.db.add(subscription_event)
                 self.db.commit()
 
                 return {
@@ -123,6 +129,78 @@ class PaymentService:
                 "message": f"Verification failed: {str(e)}"
             }
 
+    def _assign_purchase_token(self, user: User, purchase_token: str) -> None:
+        """
+        Store a Google Play purchase token on a user
+
+        A token maps to at most one user (unique index), so it is first
+        released from any other account it was stored on - e.g. when the
+        same Play subscription is restored under a new account.
+        """
+        if user.google_play_purchase_token == purchase_token:
+            return
+
+        self.db.execute(
+            update(User)
+            .where(
+                User.google_play_purchase_token == purchase_token,
+                User.id != user.id
+            )
+            .values(google_play_purchase_token=None)
+            .execution_options(synchronize_session=False)
+        )
+        user.google_play_purchase_token = purchase_token
+
+    def _log_subscription_event(
+        self,
+        user_id: Optional[str],
+        purchase_token: str,
+        product_id: str,
+        expires_at: Optional[datetime],
+        raw_receipt: Union[Dict, str]
+    ) -> None:
+        """
+        Record a purchase in subscription_events
+
+        Emitted as a Core INSERT in the caller's transaction instead of going
+        through the ORM unit of work - the event is never read back here.
+        Re-verifying the same purchase token (e.g. on every app resume)
+        updates the existing row rather than adding another one.
+        """
+        stmt = insert(SubscriptionEvent).values(
+            user_id=user_id,
+            event_type='purchase',
+            purchase_token=purchase_token,
+            product_id=product_id,
+            platform='android',
+            expires_at=expires_at,
+            raw_receipt=raw_receipt
+        )
+        self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[SubscriptionEvent.purchase_token, SubscriptionEvent.event_type],
+                set_={
+                    'user_id': func.coalesce(stmt.excluded.user_id, SubscriptionEvent.user_id),
+                    'product_id': stmt.excluded.product_id,
+                    'verified_at': stmt.excluded.verified_at,
+                    'expires_at': stmt.excluded.expires_at,
+                    'raw_receipt': stmt.excluded.raw_receipt
+                }
+            )
+        )
+
+    async def _fetch_google_play_subscription(
+        self,
+        product_id: str,
+        purchase_token: str
+    ) -> Dict:
+        """Fetch subscription details from the Google Play API"""
+        return await self.google_play_client.get_subscription(
+            package_name=settings.GOOGLE_PLAY_PACKAGE_NAME,
+            subscription_id=product_id,
+            purchase_token=purchase_token
+        )
+
     async def _mock_verify_purchase(
         self,
         user_id: str,
@@ -134,7 +212,7 @@ class PaymentService:
 
         This simulates a successful purchase without actual Google Play verification
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = self.db.get(User, _as_uuid(user_id))
         if not user:
             return {
                 "success": False,
@@ -145,35 +223,24 @@ class PaymentService:
             }
 
         # Determine subscription period based on product ID
-        if 'monthly' in product_id:
-            duration = timedelta(days=30)
-        elif 'yearly' in product_id:
-            duration = timedelta(days=365)
-        elif 'lifetime' in product_id:
-            duration = None  # No expiry
-        else:
-            duration = timedelta(days=30)
-
+        duration = get_subscription_duration(product_id)
         expiry_time = datetime.utcnow() + duration if duration else None
 
         user.subscription_tier = 'premium'
         user.subscription_expires_at = expiry_time
-        user.google_play_purchase_token = purchase_token  # Store token for webhook lookup
+        self._assign_purchase_token(user, purchase_token)  # Store token for webhook lookup
         # Clear any grace period when purchase succeeds
         user.grace_period_ends_at = None
+        self._status_cache.pop(str(user_id), None)
 
         # Log subscription event
-        subscription_event = SubscriptionEvent(
+        self._log_subscription_event(
             user_id=user_id,
-            event_type='purchase',
             purchase_token=purchase_token,
             product_id=product_id,
-            platform='android',
             expires_at=expiry_time,
             raw_receipt='MOCK_PURCHASE_FOR_DEVELOPMENT'
         )
-
-        self.db.add(subscription_event)
         self.db.commit()
 
         return {
@@ -195,9 +262,34 @@ class PaymentService:
         Returns:
             Dictionary with subscription status including grace period info
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
+        cached = self._status_cache.get(str(user_id))
+        if cached is not None:
+            return cached
 
-        if not user:
+        status = self._load_subscription_status(user_id)
+        self._status_cache[str(user_id)] = status
+        return status
+
+    def _load_subscription_status(self, user_id: str) -> Dict:
+        """
+        Build subscription status for a user from the database
+
+        The user and the product of their latest subscription event are
+        fetched in one round-trip; the latest event is a correlated
+        subquery served by ix_subscription_events_user_latest.
+        """
+        latest_product_id = (
+            select(SubscriptionEvent.product_id)
+            .where(SubscriptionEvent.user_id == User.id)
+            .order_by(SubscriptionEvent.verified_at.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        row = self.db.query(User, latest_product_id).filter(
+            User.id == _as_uuid(user_id)
+        ).first()
+
+        if not row:
             return {
                 "is_premium": False,
                 "tier": "free",
@@ -208,16 +300,13 @@ class PaymentService:
                 "subscription_status": "expired"
             }
 
-        # Get latest subscription event
-        latest_event = self.db.query(SubscriptionEvent).filter(
-            SubscriptionEvent.user_id == user_id
-        ).order_by(SubscriptionEvent.verified_at.desc()).first()
+        user, product_id = row
 
         return {
             "is_premium": user.is_premium,
             "tier": user.subscription_tier,
             "expires_at": user.subscription_expires_at,
-            "product_id": latest_event.product_id if latest_event else None,
+            "product_id": product_id,
             "is_in_grace_period": user.is_in_grace_period(),
             "grace_period_ends_at": user.grace_period_ends_at,
             "subscription_status": user.get_subscription_status()
@@ -244,17 +333,13 @@ class PaymentService:
         Returns:
             Dictionary with verification result
         """
-        if not self.google_play_service:
+        if not self.google_play_client:
             # For development: Mock verification
             return await self._mock_verify_device_purchase(device_id, purchase_token, product_id, user_id)
 
         try:
             # Verify with Google Play API
-            subscription = self.google_play_service.purchases().subscriptions().get(
-                packageName=settings.GOOGLE_PLAY_PACKAGE_NAME,
-                subscriptionId=product_id,
-                token=purchase_token
-            ).execute()
+            subscription = await self._fetch_google_play_subscription(product_id, purchase_token)
 
             # Extract expiry time
             expiry_time_millis = int(subscription.get('expiryTimeMillis', 0))
@@ -281,16 +366,13 @@ class PaymentService:
                     self._sync_subscription_to_user(user_id, product_id, expiry_time, purchase_token)
 
                 # Log subscription event (for device purchases)
-                subscription_event = SubscriptionEvent(
+                self._log_subscription_event(
                     user_id=user_id,  # May be None for anonymous device purchases
-                    event_type='purchase',
                     purchase_token=purchase_token,
                     product_id=product_id,
-                    platform='android',
                     expires_at=expiry_time,
-                    raw_receipt=str(subscription)
+                    raw_receipt=subscription
                 )
-                self.db.add(subscription_event)
 
                 self.db.commit()
 
@@ -342,7 +424,7 @@ class PaymentService:
             expiry_time: When the subscription expires (None for lifetime)
             purchase_token: Optional Google Play purchase token
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = self.db.get(User, _as_uuid(user_id))
         if not user:
             logger.warning(f"Cannot sync subscription: User not found: {user_id}")
             return
@@ -352,7 +434,9 @@ class PaymentService:
         user.grace_period_ends_at = None  # Clear grace period on successful purchase
 
         if purchase_token:
-            user.google_play_purchase_token = purchase_token
+            self._assign_purchase_token(user, purchase_token)
+
+        self._status_cache.pop(str(user_id), None)
 
         logger.info(f"Synced subscription to user: user_id={user_id}, product_id={product_id}")
 
@@ -378,15 +462,7 @@ class PaymentService:
             self.db.add(device)
 
         # Determine subscription period based on product ID
-        if 'monthly' in product_id:
-            duration = timedelta(days=30)
-        elif 'yearly' in product_id:
-            duration = timedelta(days=365)
-        elif 'lifetime' in product_id:
-            duration = None  # No expiry
-        else:
-            duration = timedelta(days=30)
-
+        duration = get_subscription_duration(product_id)
         expiry_time = datetime.utcnow() + duration if duration else None
 
         device.subscription_tier = 'premium'
@@ -401,16 +477,13 @@ class PaymentService:
             self._sync_subscription_to_user(user_id, product_id, expiry_time, purchase_token)
 
         # Log subscription event (for device purchases)
-        subscription_event = SubscriptionEvent(
+        self._log_subscription_event(
             user_id=user_id,  # May be None for anonymous device purchases
-            event_type='purchase',
             purchase_token=purchase_token,
             product_id=product_id,
-            platform='android',
             expires_at=expiry_time,
             raw_receipt='MOCK_DEVICE_PURCHASE_FOR_DEVELOPMENT'
         )
-        self.db.add(subscription_event)
 
         self.db.commit()
 
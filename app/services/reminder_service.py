@@ -1,6 +1,6 @@
 """Reminder service for backend-controlled notification scheduling"""
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, tuple_, select, insert, update, delete
 from app.models.reminder import Reminder, RecurrenceType, RecurrenceEndType
 from app.schemas.reminder import (
     ReminderCreate,
@@ -8,13 +8,34 @@ from app.schemas.reminder import (
     ReminderSyncItem
 )
 from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
+from calendar import monthrange
 from typing import List, Optional, Dict, Tuple
 from uuid import UUID, uuid4
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Fixed-length step between occurrences for each recurrence type, given the interval
+_RECURRENCE_STEPS = {
+    "hourly": lambda interval: timedelta(hours=interval),
+    "daily": lambda interval: timedelta(days=interval),
+    "weekly": lambda interval: timedelta(weeks=interval),
+}
+
+# Calendar recurrence types, as months per interval
+_RECURRENCE_MONTHS = {
+    "monthly": 1,
+    "yearly": 12,
+}
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    """Add calendar months, clamping the day to the end of a shorter month (like relativedelta)"""
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    return value.replace(year=year, month=month, day=min(value.day, monthrange(year, month)[1]))
+
 
 class ReminderService:
     """Service for managing reminders and scheduling notifications"""
@@ -44,12 +65,14 @@ class ReminderService:
 
         Returns:
             List of datetime occurrences
+
+        Raises:
+            ValueError: If recurrence_type is not a known recurrence type
         """
         if recurrence_type == "once":
             return [start_time]
 
         occurrences = [start_time]
-        current_time = start_time
 
         # Determine end condition
         max_count = max_occurrences
@@ -58,36 +81,37 @@ class ReminderService:
         if recurrence_end_type == "after_occurrences" and recurrence_end_value:
             max_count = min(int(recurrence_end_value), max_occurrences)
         elif recurrence_end_type == "on_date" and recurrence_end_value:
-            end_date = datetime.fromisoformat(recurrence_end_value.replace('Z', '+00:00'))
+            end_date = datetime.fromisoformat(recurrence_end_value)
             if end_date.tzinfo:
                 end_date = end_date.replace(tzinfo=None)
 
-        # Generate occurrences
-        while len(occurrences) < max_count:
-            # Calculate next occurrence
-            if recurrence_type == "hourly":
-                current_time = current_time + timedelta(hours=recurrence_interval)
-            elif recurrence_type == "daily":
-                current_time = current_time + timedelta(days=recurrence_interval)
-            elif recurrence_type == "weekly":
-                current_time = current_time + timedelta(weeks=recurrence_interval)
-            elif recurrence_type == "monthly":
-                current_time = current_time + relativedelta(months=recurrence_interval)
-            elif recurrence_type == "yearly":
-                current_time = current_time + relativedelta(years=recurrence_interval)
-            else:
-                break
+        # Resolve the step once; the loop only multiplies it
+        if recurrence_type in _RECURRENCE_STEPS:
+            step = _RECURRENCE_STEPS[recurrence_type](recurrence_interval)
+            offset = lambda n: start_time + step * n
+        elif recurrence_type in _RECURRENCE_MONTHS:
+            months = _RECURRENCE_MONTHS[recurrence_type] * recurrence_interval
+            offset = lambda n: _add_months(start_time, months * n)
+        else:
+            raise ValueError(f"Unknown recurrence_type: {recurrence_type}")
+
+        # Don't generate occurrences more than 1 year in the future
+        one_year_ahead = datetime.utcnow() + timedelta(days=365)
+
+        # Generate occurrences. Each one is offset from the start time rather
+        # than from the previous occurrence, so month/year steps don't drift
+        # (Jan 31 -> Feb 28 -> Mar 31, not Mar 28).
+        for n in range(1, max_count):
+            occurrence_time = offset(n)
 
             # Check end date
-            if end_date and current_time > end_date:
+            if end_date and occurrence_time > end_date:
                 break
 
-            # Don't generate occurrences more than 1 year in the future
-            one_year_ahead = datetime.utcnow() + timedelta(days=365)
-            if current_time > one_year_ahead:
+            if occurrence_time > one_year_ahead:
                 break
 
-            occurrences.append(current_time)
+            occurrences.append(occurrence_time)
 
         return occurrences
 
@@ -107,6 +131,10 @@ class ReminderService:
         Returns:
             List of created reminders (single for one-time, multiple for recurring)
         """
+        # Fast path for one-time reminders (the common case)
+        if reminder_data.recurrence_type.value == "once":
+            return self._create_single_reminder(user_id, reminder_data)
+
         # Generate occurrence times
         logger.info(f"Creating reminder for user {user_id}: type={reminder_data.recurrence_type.value}, interval={reminder_data.recurrence_interval}")
         occurrence_times = self._generate_occurrence_times(
@@ -118,55 +146,116 @@ class ReminderService:
         )
         logger.info(f"Generated {len(occurrence_times)} occurrence(s) for reminder")
 
+        from app.scheduler import get_job_id, schedule_reminders
+
         # Generate series ID for recurring reminders
-        series_id = uuid4() if reminder_data.recurrence_type != "once" else None
-        reminders = []
-        parent_id = None
-
-        for idx, occurrence_time in enumerate(occurrence_times):
-            # Create reminder for this occurrence
-            reminder = Reminder(
-                user_id=user_id,
-                note_uuid=reminder_data.note_uuid,
-                title=reminder_data.title,
-                notification_title=reminder_data.notification_title,
-                notification_content=reminder_data.notification_content,
-                reminder_time=occurrence_time,
-                is_triggered=False,
-                recurrence_type=reminder_data.recurrence_type.value,
-                recurrence_interval=reminder_data.recurrence_interval,
-                recurrence_end_type=reminder_data.recurrence_end_type.value,
-                recurrence_end_value=reminder_data.recurrence_end_value,
-                occurrence_number=idx + 1,
-                series_id=series_id,
-                parent_reminder_id=parent_id
+        series_id = uuid4()
+
+        # IDs (and the job IDs derived from them) are assigned here, so the
+        # parent is known up front and all occurrences go in one executemany
+        reminder_ids = [uuid4() for _ in occurrence_times]
+        parent_id = reminder_ids[0]
+
+        rows = [
+            {
+                "id": reminder_id,
+                "user_id": user_id,
+                "note_uuid": reminder_data.note_uuid,
+                "title": reminder_data.title,
+                "notification_title": reminder_data.notification_title,
+                "notification_content": reminder_data.notification_content,
+                "reminder_time": occurrence_time,
+                "is_triggered": False,
+                "recurrence_type": reminder_data.recurrence_type.value,
+                "recurrence_interval": reminder_data.recurrence_interval,
+                "recurrence_end_type": reminder_data.recurrence_end_type.value,
+                "recurrence_end_value": reminder_data.recurrence_end_value,
+                "occurrence_number": idx + 1,
+                "series_id": series_id,
+                # First occurrence is the parent
+                "parent_reminder_id": parent_id if idx > 0 else None,
+                "celery_task_id": get_job_id(reminder_id)
+            }
+            for idx, (reminder_id, occurrence_time) in enumerate(zip(reminder_ids, occurrence_times))
+        ]
+
+        self.db.execute(insert(Reminder), rows)
+        self.db.commit()
+
+        # Schedule after commit. The committed rows are the durable record: if
+        # scheduling fails here, restore_pending_reminders (on startup) and the
+        # missed-reminder check pick them up.
+        try:
+            schedule_reminders(
+                [(str(row["id"]), row["reminder_time"]) for row in rows]
             )
+        except Exception as e:
+            logger.error(f"Failed to schedule reminders for user {user_id}: {e}")
 
-            self.db.add(reminder)
-            self.db.flush()  # Get the ID
+        # Load the created reminders in one query (instead of a refresh per row)
+        reminders = self.db.query(Reminder).filter(
+            Reminder.id.in_(reminder_ids)
+        ).order_by(Reminder.occurrence_number).all()
 
-            # First occurrence is the parent
-            if idx == 0:
-                parent_id = reminder.id
+        logger.info(f"Created {len(reminders)} reminder occurrence(s) for user {user_id}")
+        return reminders
 
-            # Schedule task
-            try:
-                task_id = await self._schedule_reminder_task(reminder)
-                reminder.celery_task_id = task_id
-                logger.info(f"Scheduled reminder {reminder.id} occurrence {idx+1} at {occurrence_time}")
-            except Exception as e:
-                logger.error(f"Failed to schedule reminder {reminder.id}: {e}")
+    def _create_single_reminder(
+        self,
+        user_id: UUID,
+        reminder_data: ReminderCreate
+    ) -> List[Reminder]:
+        """
+        Create and schedule a one-time reminder
+
+        Skips occurrence generation and series bookkeeping. Every column is
+        set client-side, so the reminder is detached before the commit and
+        returned as-is instead of being re-read after expire-on-commit.
 
-            reminders.append(reminder)
+        Args:
+            user_id: User ID
+            reminder_data: Reminder creation data
+
+        Returns:
+            List containing the created reminder
+        """
+        from app.scheduler import get_job_id, schedule_reminders
+
+        reminder_id = uuid4()
+        reminder = Reminder(
+            id=reminder_id,
+            user_id=user_id,
+            note_uuid=reminder_data.note_uuid,
+            title=reminder_data.title,
+            notification_title=reminder_data.notification_title,
+            notification_content=reminder_data.notification_content,
+            description=None,
+            reminder_time=reminder_data.reminder_time,
+            is_triggered=False,
+            triggered_at=None,
+            recurrence_type=reminder_data.recurrence_type.value,
+            recurrence_interval=reminder_data.recurrence_interval,
+            recurrence_end_type=reminder_data.recurrence_end_type.value,
+            recurrence_end_value=reminder_data.recurrence_end_value,
+            occurrence_number=1,
+            series_id=None,
+            parent_reminder_id=None,
+            celery_task_id=get_job_id(reminder_id)
+        )
 
+        self.db.add(reminder)
+        self.db.flush()
+        self.db.expunge(reminder)
         self.db.commit()
 
-        # Refresh all reminders
-        for reminder in reminders:
-            self.db.refresh(reminder)
+        # Schedule after commit (see create_reminder)
+        try:
+            schedule_reminders([(str(reminder_id), reminder.reminder_time)])
+        except Exception as e:
+            logger.error(f"Failed to schedule reminder {reminder_id}: {e}")
 
-        logger.info(f"Created {len(reminders)} reminder occurrence(s) for user {user_id}")
-        return reminders
+        logger.info(f"Created one-time reminder {reminder_id} for user {user_id}")
+        return [reminder]
 
     async def update_reminder(
         self,
@@ -188,77 +277,76 @@ class ReminderService:
         Returns:
             List of updated reminders or None if not found
         """
-        # Get reminder and verify ownership
-        reminder = self.db.query(Reminder).filter(
-            and_(
-                Reminder.id == reminder_id,
-                Reminder.user_id == user_id
+        # Update the reminder (or its pending series) in one UPDATE ... RETURNING;
+        # ownership is enforced by the user_id predicate
+        values = {'updated_at': datetime.utcnow()}
+        if reminder_data.title is not None:
+            values['title'] = reminder_data.title
+        if reminder_data.notification_title is not None:
+            values['notification_title'] = reminder_data.notification_title
+        if reminder_data.notification_content is not None:
+            values['notification_content'] = reminder_data.notification_content
+        if reminder_data.reminder_time is not None:
+            values['reminder_time'] = reminder_data.reminder_time
+        if reminder_data.recurrence_type is not None:
+            values['recurrence_type'] = reminder_data.recurrence_type.value
+        if reminder_data.recurrence_interval is not None:
+            values['recurrence_interval'] = reminder_data.recurrence_interval
+
+        updated_reminders = self.db.scalars(
+            update(Reminder)
+            .where(
+                Reminder.user_id == user_id,
+                self._target_scope(reminder_id, user_id, update_series, pending_only=True)
             )
-        ).first()
+            .values(**values)
+            .returning(Reminder)
+        ).all()
 
-        if not reminder:
+        if not updated_reminders:
             return None
 
-        # Determine which reminders to update
-        if update_series and reminder.series_id:
-            # Update all occurrences in the series
-            reminders_to_update = self.db.query(Reminder).filter(
-                and_(
-                    Reminder.user_id == user_id,
-                    Reminder.series_id == reminder.series_id,
-                    Reminder.is_triggered == False  # Only update future occurrences
-                )
-            ).all()
-        else:
-            # Update only this reminder
-            reminders_to_update = [reminder]
+        # Capture what is needed after the commit, which expires the rows
+        updated_ids = [rem.id for rem in updated_reminders]
+        to_reschedule = [
+            (rem.id, rem.reminder_time, rem.celery_task_id)
+            for rem in updated_reminders
+            if not rem.is_triggered
+        ] if reminder_data.reminder_time is not None else []
 
-        updated_reminders = []
-
-        for rem in reminders_to_update:
-            # Check if reminder time is being updated
-            time_changed = (
-                reminder_data.reminder_time is not None
-                and reminder_data.reminder_time != rem.reminder_time
-            )
+        self.db.commit()
 
-            # Update fields
-            if reminder_data.title is not None:
-                rem.title = reminder_data.title
-            if reminder_data.notification_title is not None:
-                rem.notification_title = reminder_data.notification_title
-            if reminder_data.notification_content is not None:
-                rem.notification_content = reminder_data.notification_content
-            if reminder_data.reminder_time is not None:
-                rem.reminder_time = reminder_data.reminder_time
-            if reminder_data.recurrence_type is not None:
-                rem.recurrence_type = reminder_data.recurrence_type.value
-            if reminder_data.recurrence_interval is not None:
-                rem.recurrence_interval = reminder_data.recurrence_interval
-
-            # Reschedule if time changed
-            if time_changed and not rem.is_triggered:
-                try:
-                    # Cancel old task
-                    if rem.celery_task_id:
-                        await self._cancel_reminder_task(rem.celery_task_id)
-
-                    # Schedule new task
-                    task_id = await self._schedule_reminder_task(rem)
-                    rem.celery_task_id = task_id
-                    logger.info(f"Rescheduled reminder {rem.id} with new task {task_id}")
-                except Exception as e:
-                    logger.error(f"Failed to reschedule reminder {rem.id}: {e}")
-
-            updated_reminders.append(rem)
+        # Reschedule if time changed: one batch for all pending updated rows,
+        # after the commit so no transaction is held open while scheduling
+        if to_reschedule:
+            from app.scheduler import schedule_reminders
 
-        self.db.commit()
+            job_ids = schedule_reminders(
+                [(str(rem_id), reminder_time) for rem_id, reminder_time, _ in to_reschedule]
+            )
 
-        # Refresh all reminders
-        for rem in updated_reminders:
-            self.db.refresh(rem)
+            # Job IDs are derived from the reminder ID, so scheduling replaces
+            # the old job; only rows stored under another ID need fixing up
+            stale = [
+                (rem_id, old_task_id, job_id)
+                for (rem_id, _, old_task_id), job_id in zip(to_reschedule, job_ids)
+                if job_id and old_task_id != job_id
+            ]
+            if stale:
+                for _, old_task_id, _ in stale:
+                    if old_task_id:
+                        await self._cancel_reminder_task(old_task_id)
+
+                self.db.execute(
+                    update(Reminder),
+                    [{"id": rem_id, "celery_task_id": job_id} for rem_id, _, job_id in stale]
+                )
+                self.db.commit()
 
-        return updated_reminders
+        # Reload all updated reminders in one query (instead of a refresh per row)
+        return self.db.query(Reminder).filter(
+            Reminder.id.in_(updated_ids)
+        ).order_by(Reminder.reminder_time.asc()).all()
 
     async def delete_reminder(
         self,
@@ -270,6 +358,9 @@ class ReminderService:
         Delete reminder and cancel scheduled task
         Can delete single occurrence or entire series
 
+        The whole series is removed by one set-based DELETE ... RETURNING;
+        the returned rows supply the count and the jobs to cancel.
+
         Args:
             reminder_id: Reminder ID
             user_id: User ID (for authorization)
@@ -278,48 +369,85 @@ class ReminderService:
         Returns:
             Tuple of (success: bool, deleted_count: int)
         """
-        reminder = self.db.query(Reminder).filter(
-            and_(
-                Reminder.id == reminder_id,
-                Reminder.user_id == user_id
+        if not delete_series:
+            # Detach later occurrences first: the self-referencing FK cascades on
+            # delete, and deleting one occurrence must not take the rest with it
+            self.db.execute(
+                update(Reminder)
+                .where(
+                    Reminder.user_id == user_id,
+                    Reminder.parent_reminder_id == reminder_id
+                )
+                .values(parent_reminder_id=None)
+                .execution_options(synchronize_session=False)
             )
-        ).first()
 
-        if not reminder:
-            return (False, 0)
+        # Delete and collect task IDs in one DELETE ... RETURNING
+        deleted = self.db.execute(
+            delete(Reminder)
+            .where(
+                Reminder.user_id == user_id,
+                self._target_scope(reminder_id, user_id, delete_series)
+            )
+            .returning(Reminder.id, Reminder.celery_task_id, Reminder.is_triggered)
+            .execution_options(synchronize_session=False)
+        ).all()
 
-        # Determine which reminders to delete
-        if delete_series and reminder.series_id:
-            # Delete all occurrences in the series (including triggered ones)
-            reminders_to_delete = self.db.query(Reminder).filter(
-                and_(
-                    Reminder.user_id == user_id,
-                    Reminder.series_id == reminder.series_id
-                )
-            ).all()
-        else:
-            # Delete only this reminder
-            reminders_to_delete = [reminder]
+        if not deleted:
+            self.db.rollback()
+            return (False, 0)
 
-        deleted_count = 0
+        # Cancel tasks that exist and haven't triggered, in one batch
+        from app.scheduler import cancel_reminders
 
-        for rem in reminders_to_delete:
-            # Cancel task if exists and not triggered
-            if rem.celery_task_id and not rem.is_triggered:
-                try:
-                    await self._cancel_reminder_task(rem.celery_task_id)
-                    logger.info(f"Cancelled task {rem.celery_task_id} for reminder {rem.id}")
-                except Exception as e:
-                    logger.error(f"Failed to cancel task {rem.celery_task_id}: {e}")
+        cancel_reminders([
+            rem.celery_task_id for rem in deleted
+            if rem.celery_task_id and not rem.is_triggered
+        ])
 
-            # Delete from database
-            self.db.delete(rem)
-            deleted_count += 1
+        deleted_count = len(deleted)
 
         self.db.commit()
         logger.info(f"Deleted {deleted_count} reminder(s)")
         return (True, deleted_count)
 
+    def _target_scope(
+        self,
+        reminder_id: UUID,
+        user_id: UUID,
+        whole_series: bool,
+        pending_only: bool = False
+    ):
+        """
+        Build the WHERE clause selecting a reminder or its whole series
+
+        The series is resolved with a scalar subquery, so the caller's
+        UPDATE/DELETE needs no prior SELECT. Reminders without a series
+        fall back to just the reminder itself.
+
+        Args:
+            reminder_id: Reminder ID
+            user_id: User ID (for authorization)
+            whole_series: If True, match every occurrence in the reminder's series
+            pending_only: If True, only match untriggered series occurrences
+        """
+        if not whole_series:
+            return Reminder.id == reminder_id
+
+        target_series = select(Reminder.series_id).where(
+            Reminder.id == reminder_id,
+            Reminder.user_id == user_id
+        ).scalar_subquery()
+
+        in_series = Reminder.series_id == target_series
+        if pending_only:
+            in_series = and_(in_series, Reminder.is_triggered == False)
+
+        return or_(
+            in_series,
+            and_(Reminder.id == reminder_id, target_series.is_(None))
+        )
+
     async def get_user_reminders(
         self,
         user_id: UUID,
@@ -379,18 +507,27 @@ class ReminderService:
         Returns:
             Dictionary with created/updated counts
         """
+        from app.scheduler import get_job_id, schedule_reminders
+
         created = 0
         updated = 0
 
+        # For sync, we match by note_uuid and occurrence_number to find the exact
+        # occurrence - fetch all matches in one query instead of one per item
+        keys = {(r.note_uuid, r.occurrence_number) for r in reminders}
+        existing_map = {
+            (r.note_uuid, r.occurrence_number): r
+            for r in self.db.query(Reminder).filter(
+                Reminder.user_id == user_id,
+                tuple_(Reminder.note_uuid, Reminder.occurrence_number).in_(keys)
+            ).all()
+        } if keys else {}
+
+        new_rows = {}
+
         for reminder_data in reminders:
-            # For sync, we check by note_uuid and occurrence_number to find exact occurrence
-            existing = self.db.query(Reminder).filter(
-                and_(
-                    Reminder.user_id == user_id,
-                    Reminder.note_uuid == reminder_data.note_uuid,
-                    Reminder.occurrence_number == reminder_data.occurrence_number
-                )
-            ).first()
+            key = (reminder_data.note_uuid, reminder_data.occurrence_number)
+            existing = existing_map.get(key)
 
             if existing:
                 # Update existing reminder
@@ -403,58 +540,88 @@ class ReminderService:
                 existing.recurrence_end_type = reminder_data.recurrence_end_type
                 existing.recurrence_end_value = reminder_data.recurrence_end_value
                 if reminder_data.series_id:
-                    existing.series_id = UUID(reminder_data.series_id)
+                    existing.series_id = reminder_data.series_id
                 updated += 1
             else:
-                # Create new reminder
-                new_reminder = Reminder(
-                    user_id=user_id,
-                    note_uuid=reminder_data.note_uuid,
-                    title=reminder_data.title,
-                    notification_title=reminder_data.notification_title,
-                    notification_content=reminder_data.notification_content,
-                    reminder_time=reminder_data.reminder_time,
-                    is_triggered=False,
-                    recurrence_type=reminder_data.recurrence_type,
-                    recurrence_interval=reminder_data.recurrence_interval,
-                    recurrence_end_type=reminder_data.recurrence_end_type,
-                    recurrence_end_value=reminder_data.recurrence_end_value,
-                    occurrence_number=reminder_data.occurrence_number,
-                    series_id=UUID(reminder_data.series_id) if reminder_data.series_id else None
-                )
-                self.db.add(new_reminder)
-                created += 1
-
-                # Schedule task for new reminders
-                try:
-                    self.db.flush()  # Get the ID
-                    task_id = await self._schedule_reminder_task(new_reminder)
-                    new_reminder.celery_task_id = task_id
-                except Exception as e:
-                    logger.error(f"Failed to schedule synced reminder: {e}")
+                # Create new reminder (a key repeated within the batch replaces
+                # the pending row rather than inserting a duplicate)
+                if key not in new_rows:
+                    created += 1
+
+                reminder_id = uuid4()
+                new_rows[key] = {
+                    "id": reminder_id,
+                    "user_id": user_id,
+                    "note_uuid": reminder_data.note_uuid,
+                    "title": reminder_data.title,
+                    "notification_title": reminder_data.notification_title,
+                    "notification_content": reminder_data.notification_content,
+                    "reminder_time": reminder_data.reminder_time,
+                    "is_triggered": False,
+                    "recurrence_type": reminder_data.recurrence_type,
+                    "recurrence_interval": reminder_data.recurrence_interval,
+                    "recurrence_end_type": reminder_data.recurrence_end_type,
+                    "recurrence_end_value": reminder_data.recurrence_end_value,
+                    "occurrence_number": reminder_data.occurrence_number,
+                    "series_id": reminder_data.series_id,
+                    "celery_task_id": get_job_id(reminder_id)
+                }
+
+        # Insert all new reminders in one executemany
+        if new_rows:
+            self.db.execute(insert(Reminder), list(new_rows.values()))
 
         self.db.commit()
 
+        # Schedule tasks for all new reminders in one batch, after commit
+        if new_rows:
+            try:
+                schedule_reminders(
+                    [(str(row["id"]), row["reminder_time"]) for row in new_rows.values()]
+                )
+            except Exception as e:
+                logger.error(f"Failed to schedule synced reminders: {e}")
+
         return {
             "created": created,
             "updated": updated,
             "total": created + updated
         }
 
-    async def get_due_reminders(self) -> List[Reminder]:
+    async def get_due_reminders(
+        self,
+        limit: int = 500,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Reminder]:
         """
         Get reminders that are due to be triggered (for catch-up job)
 
+        Results are ordered by (reminder_time, id) and paged by keyset:
+        pass the (reminder_time, id) of the last row of the previous page
+        as ``after`` to fetch the next page.
+
+        Args:
+            limit: Maximum number of reminders to return
+            after: Keyset cursor from the previous page
+
         Returns:
             List of due reminders
         """
+        # reminder_time is TIMESTAMP WITHOUT TIME ZONE holding naive UTC, so
+        # comparing against a naive utcnow() needs no cast and is answered
+        # straight from the ix_reminders_due_pending partial index
         now = datetime.utcnow()
-        return self.db.query(Reminder).filter(
+        query = self.db.query(Reminder).filter(
             and_(
                 Reminder.is_triggered == False,
                 Reminder.reminder_time <= now
             )
-        ).all()
+        )
+
+        if after is not None:
+            query = query.filter(tuple_(Reminder.reminder_time, Reminder.id) > tuple_(*after))
+
+        return query.order_by(Reminder.reminder_time, Reminder.id).limit(limit).all()
 
     async def mark_triggered(self, reminder: Reminder):
         """
@@ -467,32 +634,6 @@ class ReminderService:
         self.db.commit()
 
     # Celery task management methods
-    async def _schedule_reminder_task(self, reminder: Reminder) -> str:
-        """
-        Schedule reminder task using APScheduler
-
-        Returns:
-            Job ID
-        """
-        try:
-            from app.scheduler import schedule_reminder
-            from datetime import datetime
-
-            logger.info(f"📅 Scheduling reminder {reminder.id} for {reminder.reminder_time} (current time: {datetime.utcnow()})")
-
-            # Schedule the task
-            job_id = schedule_reminder(
-                reminder_id=str(reminder.id),
-                reminder_time=reminder.reminder_time
-            )
-
-            logger.info(f"✅ Successfully scheduled reminder {reminder.id} with job_id={job_id}")
-            return job_id
-
-        except Exception as e:
-            logger.error(f"❌ Failed to schedule reminder {reminder.id}: {e}", exc_info=True)
-            raise
-
     async def _cancel_reminder_task(self, task_id: str):
         """
         Cancel scheduled reminder task
@@ -500,13 +641,8 @@ class ReminderService:
         Args:
             task_id: Job ID to cancel
         """
-        try:
-            from app.scheduler import cancel_reminder
-
-            # Cancel the job
-            cancel_reminder(task_id)
-            logger.info(f"Cancelled reminder job {task_id}")
+        from app.scheduler import cancel_reminder
 
-        except Exception as e:
-            logger.error(f"Failed to cancel reminder job {task_id}: {e}")
-            raise
+        # Best-effort: the job re-checks the reminder before sending, so a
+        # missed cancellation can't deliver a deleted or already-sent reminder
+        cancel_reminder(task_id)
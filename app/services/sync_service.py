@@ -1,12 +1,44 @@
 """Note synchronization service"""
+from sqlalchemy import String, any_, func, insert, literal, select, update, delete
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from app.models.note import EncryptedNote, SyncEvent
-from app.models.user import User
-from app.schemas.note import EncryptedNoteCreate
+from app.models.user import User, UsageTracking
+from app.schemas.note import EncryptedNoteCreate, NoteMetadata
 from app.services.usage_service import UsageService
-from typing import List, Dict
-import base64
-from datetime import datetime
+from typing import List, Dict, Optional
+from binascii import a2b_base64
+import uuid
+from datetime import datetime, timezone
+
+
+def _parse_client_timestamp(value: str) -> datetime:
+    """
+    Parse a client ISO 8601 timestamp into the naive UTC value the database stores
+
+    The timestamp columns hold naive UTC, so an offset-aware timestamp is
+    converted to UTC before its offset is dropped (the response is built
+    from this value and must match what is stored). A naive timestamp is
+    taken as UTC. Python 3.11's fromisoformat accepts a trailing 'Z' directly.
+    """
+    dt = datetime.fromisoformat(value)
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def _any_of(values):
+    """
+    Bind a list of strings as one Postgres array for `column == ANY(...)`
+
+    Unlike IN (...), which expands to one bound parameter per value, the
+    statement text is the same for any batch size, so it compiles once.
+    """
+    return any_(literal(list(values), ARRAY(String)))
+
+
+def _counts_toward_limit(metadata: Optional[NoteMetadata]) -> bool:
+    """Whether a synced note counts toward the free-tier limit (deleted and reminder notes don't)"""
+    return not (metadata and (metadata.is_deleted or metadata.type == 'reminder'))
 
 
 class SyncService:
@@ -20,19 +52,31 @@ class SyncService:
         user_id: str,
         since: int = 0,
         include_deleted: bool = False
-    ) -> List[EncryptedNote]:
+    ) -> List[Row]:
         """
         Get all notes for a user (for sync)
 
+        Only the columns the sync response needs are selected, as plain rows
+        rather than ORM objects.
+
         Args:
             user_id: User ID
             since: Unix timestamp for incremental sync
             include_deleted: Whether to include soft-deleted notes
 
         Returns:
-            List of encrypted notes
+            List of note rows
         """
-        query = self.db.query(EncryptedNote).filter(
+        query = self.db.query(
+            EncryptedNote.id,
+            EncryptedNote.client_note_uuid,
+            EncryptedNote.encrypted_data,
+            EncryptedNote.note_metadata,
+            EncryptedNote.version,
+            EncryptedNote.created_at,
+            EncryptedNote.updated_at,
+            EncryptedNote.is_deleted
+        ).filter(
             EncryptedNote.user_id == user_id
         )
 
@@ -40,7 +84,9 @@ class SyncService:
         # Note: Client sends timestamp in milliseconds, convert to seconds
         if since > 0:
             since_seconds = since / 1000 if since > 9999999999 else since
-            since_datetime = datetime.utcfromtimestamp(since_seconds)
+            # updated_at is TIMESTAMP WITHOUT TIME ZONE holding UTC, so compare
+            # with a naive UTC bound (no cast; ix_encrypted_notes_sync applies)
+            since_datetime = datetime.fromtimestamp(since_seconds, tz=timezone.utc).replace(tzinfo=None)
             query = query.filter(EncryptedNote.updated_at > since_datetime)
 
         # Optionally exclude deleted notes
@@ -74,8 +120,9 @@ class SyncService:
         """
         usage_service = UsageService(self.db)
 
-        # Get user and check premium status
-        user = self.db.query(User).filter(User.id == user_id).first()
+        # Get user and check premium status (normally already in the session's
+        # identity map from authentication, so no query is issued)
+        user = self.db.get(User, uuid.UUID(str(user_id)))
         if not user:
             return {
                 "synced_count": 0,
@@ -87,24 +134,43 @@ class SyncService:
 
         is_premium = user.is_premium
 
+        # Fetch all notes being synced that already exist in one query. Only the
+        # columns the response needs are loaded; the stored encrypted blobs are
+        # about to be overwritten and never need to leave the database.
+        client_note_uuids = {note_data.client_note_uuid for note_data in encrypted_notes}
+        existing_notes = {
+            note.client_note_uuid: note
+            for note in self.db.query(
+                EncryptedNote.id,
+                EncryptedNote.client_note_uuid,
+                EncryptedNote.created_at,
+                EncryptedNote.is_deleted
+            ).filter(
+                EncryptedNote.user_id == user_id,
+                EncryptedNote.client_note_uuid == _any_of(client_note_uuids)
+            ).all()
+        } if client_note_uuids else {}
+
         # Count how many NEW notes we're trying to create (vs updates)
         # Exclude reminder notes as they don't count toward the 50-note limit
+        # (a note repeated within the batch is created once, by its first entry)
         new_notes_count = 0
+        counted_uuids = set()
         for note_data in encrypted_notes:
-            existing_note = self.db.query(EncryptedNote).filter(
-                EncryptedNote.user_id == user_id,
-                EncryptedNote.client_note_uuid == note_data.client_note_uuid
-            ).first()
             # Only count non-deleted, non-reminder notes
-            is_new = not existing_note
-            is_not_deleted = not (note_data.metadata and note_data.metadata.is_deleted)
-            is_not_reminder = not (note_data.metadata and note_data.metadata.type == 'reminder')
-            if is_new and is_not_deleted and is_not_reminder:
-                new_notes_count += 1
+            is_new = (
+                note_data.client_note_uuid not in existing_notes
+                and note_data.client_note_uuid not in counted_uuids
+            )
+            if is_new:
+                counted_uuids.add(note_data.client_note_uuid)
+                if _counts_toward_limit(note_data.metadata):
+                    new_notes_count += 1
 
         # For free users, check if they would exceed limit
         if not is_premium:
-            current_usage = usage_service.get_or_create_usage_tracking(user_id)
+            # Anything created or reset here commits with the sync itself
+            current_usage = usage_service.get_or_create_usage_tracking(user_id, commit=False)
             would_exceed_limit = (current_usage.synced_notes_count + new_notes_count) > 50
 
             if would_exceed_limit:
@@ -122,106 +188,136 @@ class SyncService:
 
         synced_count = 0
         updated_notes = []
+        note_updates = []
+        # Rows about to be inserted, by client_note_uuid: a repeat of the same
+        # note later in the batch updates its pending row instead of adding a
+        # second one (which would violate uq_user_client_note_uuid and fail
+        # the whole INSERT)
+        new_rows = {}
         conflicts = []
         new_notes_created = 0
 
         for note_data in encrypted_notes:
             # Check if note exists by UUID
-            existing_note = self.db.query(EncryptedNote).filter(
-                EncryptedNote.user_id == user_id,
-                EncryptedNote.client_note_uuid == note_data.client_note_uuid
-            ).first()
+            existing_note = existing_notes.get(note_data.client_note_uuid)
 
-            # Decode base64 encrypted data
+            # Decode base64 encrypted data (binascii.Error and the non-ASCII
+            # input error are both ValueErrors)
             try:
-                encrypted_blob = base64.b64decode(note_data.encrypted_data)
-            except Exception:
+                encrypted_blob = a2b_base64(note_data.encrypted_data)
+            except ValueError:
                 conflicts.append({
                     "client_note_uuid": note_data.client_note_uuid,
                     "error": "Invalid base64 encoding"
                 })
                 continue
 
+            # Read the metadata once for both the update and insert paths
+            metadata = note_data.metadata
+            metadata_dict = metadata.model_dump() if metadata else None
+
+            # IMPORTANT: Preserve client's timestamp from metadata
+            # This ensures timestamps stay consistent across devices
+            client_timestamp = None
+            if metadata and metadata.updated_at:
+                try:
+                    client_timestamp = _parse_client_timestamp(metadata.updated_at)
+                except Exception:
+                    pass  # Fall back to server time if client timestamp is invalid
+
             if existing_note:
                 # Update existing note
                 # Simple conflict resolution: last write wins
                 # TODO: Implement proper version-based conflict resolution
 
-                existing_note.encrypted_data = encrypted_blob
-                existing_note.note_metadata = note_data.metadata.dict() if note_data.metadata else None
-                existing_note.version = note_data.version
+                changes = {
+                    "id": existing_note.id,
+                    "encrypted_data": encrypted_blob,
+                    "note_metadata": metadata_dict,
+                    "version": note_data.version,
+                    "updated_at": client_timestamp or datetime.utcnow(),
+                }
 
                 # IMPORTANT: Update is_deleted column from metadata
                 # This ensures proper filtering and reconciliation
-                if note_data.metadata and note_data.metadata.is_deleted is not None:
-                    existing_note.is_deleted = note_data.metadata.is_deleted
-
-                # IMPORTANT: Preserve client's timestamp from metadata
-                # This ensures timestamps stay consistent across devices
-                if note_data.metadata and note_data.metadata.updated_at:
-                    try:
-                        client_timestamp = datetime.fromisoformat(note_data.metadata.updated_at.replace('Z', '+00:00'))
-                        existing_note.updated_at = client_timestamp
-                    except Exception:
-                        # Fallback to server time if client timestamp is invalid
-                        existing_note.updated_at = datetime.utcnow()
-                else:
-                    existing_note.updated_at = datetime.utcnow()
-
-                updated_notes.append(existing_note)
+                if metadata:
+                    changes["is_deleted"] = metadata.is_deleted
+
+                note_updates.append(changes)
+                updated_notes.append({
+                    **changes,
+                    "encrypted_data": note_data.encrypted_data,
+                    "client_note_uuid": existing_note.client_note_uuid,
+                    "created_at": existing_note.created_at,
+                    "is_deleted": changes.get("is_deleted", existing_note.is_deleted)
+                })
+                synced_count += 1
+            elif note_data.client_note_uuid in new_rows:
+                # Created earlier in this batch - last write wins on the
+                # pending row (same fields as an update of an existing note)
+                pending_row = new_rows[note_data.client_note_uuid]
+                pending_row.update({
+                    "encrypted_data": encrypted_blob,
+                    "note_metadata": metadata_dict,
+                    "version": note_data.version,
+                    "updated_at": client_timestamp or datetime.utcnow(),
+                })
+                if metadata:
+                    pending_row["is_deleted"] = metadata.is_deleted
+
+                updated_notes.append({**pending_row, "encrypted_data": note_data.encrypted_data})
                 synced_count += 1
             else:
                 # Create new note (increment counter for free users)
                 # Preserve client's timestamp if provided
-                created_at = datetime.utcnow()
-                updated_at = datetime.utcnow()
-
-                if note_data.metadata and note_data.metadata.updated_at:
-                    try:
-                        client_timestamp = datetime.fromisoformat(note_data.metadata.updated_at.replace('Z', '+00:00'))
-                        updated_at = client_timestamp
-                        created_at = client_timestamp
-                    except Exception:
-                        pass  # Use server time
-
-                # Set is_deleted from metadata
-                is_deleted = note_data.metadata.is_deleted if note_data.metadata and note_data.metadata.is_deleted is not None else False
-
-                new_note = EncryptedNote(
-                    user_id=user_id,
-                    client_note_id=note_data.client_note_id,  # Use client's DB ID for unique constraint
-                    client_note_uuid=note_data.client_note_uuid,
-                    encrypted_data=encrypted_blob,
-                    note_metadata=note_data.metadata.dict() if note_data.metadata else None,
-                    version=note_data.version,
-                    is_deleted=is_deleted,
-                    created_at=created_at,
-                    updated_at=updated_at
-                )
-
-                self.db.add(new_note)
-                updated_notes.append(new_note)
+                timestamp = client_timestamp or datetime.utcnow()
+
+                new_row = {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "client_note_id": note_data.client_note_id,  # Use client's DB ID for unique constraint
+                    "client_note_uuid": note_data.client_note_uuid,
+                    "encrypted_data": encrypted_blob,
+                    "note_metadata": metadata_dict,
+                    "version": note_data.version,
+                    # Set is_deleted from metadata
+                    "is_deleted": metadata.is_deleted if metadata else False,
+                    "created_at": timestamp,
+                    "updated_at": timestamp
+                }
+                new_rows[note_data.client_note_uuid] = new_row
+                updated_notes.append({**new_row, "encrypted_data": note_data.encrypted_data})
                 synced_count += 1
 
                 # Track new note creation (exclude reminder notes from count)
                 # Reminder notes are a free feature and don't count toward sync limits
-                is_not_deleted = not (note_data.metadata and note_data.metadata.is_deleted)
-                is_not_reminder = not (note_data.metadata and note_data.metadata.type == 'reminder')
-                if is_not_deleted and is_not_reminder:
+                if _counts_toward_limit(metadata):
                     new_notes_created += 1
 
-        # Commit all changes
+        # Write all changes in one transaction: one executemany UPDATE by primary
+        # key for existing notes, one multi-row INSERT for new ones
         try:
-            self.db.commit()
-
-            # Update usage counter for new notes (FREE USERS ONLY)
+            # Claim the free-tier slots for new notes first (FREE USERS ONLY).
+            # The conditional UPDATE locks the usage row until commit, so two
+            # concurrent syncs can't both pass the limit check above.
             # Premium users don't need tracking since they have unlimited
             if new_notes_created > 0 and not is_premium:
-                usage_service.increment_synced_notes(user_id, new_notes_created)
-
-            # Refresh all notes to get updated timestamps
-            for note in updated_notes:
-                self.db.refresh(note)
+                if not usage_service.claim_synced_notes(user_id, new_notes_created):
+                    self.db.rollback()
+                    return {
+                        "synced_count": 0,
+                        "updated_notes": [],
+                        "conflicts": [],
+                        "message": "Sync limit exceeded. Free plan allows 50 notes. Upgrade to Premium for unlimited sync.",
+                        "limit_exceeded": True,
+                        "usage": usage_service.get_user_usage(user_id),
+                    }
+
+            if note_updates:
+                self.db.execute(update(EncryptedNote), note_updates)
+
+            if new_rows:
+                self.db.execute(insert(EncryptedNote), list(new_rows.values()))
 
             # Log sync event
             sync_event = SyncEvent(
@@ -243,9 +339,10 @@ class SyncService:
                 "usage": usage_service.get_user_usage(user_id),
             }
 
-        # Convert encrypted_data back to base64 for response
-        for note in updated_notes:
-            note.encrypted_data = base64.b64encode(note.encrypted_data).decode('utf-8')
+        # The response is built from the values written above (IDs and
+        # timestamps are all set here, not by the database), so nothing is
+        # re-read after commit. encrypted_data echoes the client's base64
+        # string as received, so the stored bytes are never re-encoded.
 
         # Get updated usage stats to send back to client
         usage_stats = usage_service.get_user_usage(user_id)
@@ -275,41 +372,48 @@ class SyncService:
         Returns:
             Number of notes deleted
         """
-        usage_service = UsageService(self.db)
-
-        # Get notes to be deleted
-        notes_to_delete = self.db.query(EncryptedNote).filter(
-            EncryptedNote.user_id == user_id,
-            EncryptedNote.client_note_uuid.in_(client_note_uuids)
-        ).all()
-
-        # Count only non-reminder notes for usage tracking
-        # Reminder notes don't count toward the 50-note limit
-        non_reminder_count = sum(
-            1 for note in notes_to_delete
-            if not (note.note_metadata and note.note_metadata.get('type') == 'reminder')
-        )
-
-        # Perform deletion
-        notes_query = self.db.query(EncryptedNote).filter(
+        scope = (
             EncryptedNote.user_id == user_id,
-            EncryptedNote.client_note_uuid.in_(client_note_uuids)
+            EncryptedNote.client_note_uuid == _any_of(client_note_uuids)
         )
 
         if hard_delete:
-            notes_query.delete(synchronize_session=False)
+            stmt = delete(EncryptedNote).where(*scope)
         else:
-            notes_query.update(
-                {"is_deleted": True, "updated_at": datetime.utcnow()},
-                synchronize_session=False
+            stmt = update(EncryptedNote).where(*scope).values(
+                is_deleted=True,
+                updated_at=func.timezone('utc', func.now())
             )
 
-        self.db.commit()
+        # Perform deletion as a data-modifying CTE, returning each note's type
+        # so the usage count is derived in the same statement
+        deleted = stmt.returning(
+            EncryptedNote.note_metadata['type'].astext.label('note_type')
+        ).cte('deleted')
+        query = select(func.count()).select_from(deleted)
+
+        # Decrement usage counter for deleted notes (FREE USERS ONLY), also in
+        # the same statement. Only count non-reminder notes: reminder notes
+        # don't count toward the 50-note limit. The user is normally already
+        # loaded in this session, so checking premium status costs no query.
+        user = self.db.get(User, uuid.UUID(str(user_id)))
+        if user and not user.is_premium:
+            non_reminder_count = select(func.count()).select_from(deleted).where(
+                deleted.c.note_type.is_distinct_from('reminder')
+            ).scalar_subquery()
+            query = query.add_cte(
+                update(UsageTracking).where(
+                    UsageTracking.user_id == user_id,
+                    non_reminder_count > 0
+                ).values(
+                    synced_notes_count=func.greatest(
+                        UsageTracking.synced_notes_count - non_reminder_count, 0
+                    ),
+                    updated_at=func.timezone('utc', func.now())
+                ).cte('decremented')
+            )
 
-        # Decrement usage counter for deleted notes (FREE USERS ONLY)
-        # Only count non-reminder notes
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if non_reminder_count > 0 and user and not user.is_premium:
-            usage_service.decrement_synced_notes(user_id, non_reminder_count)
+        deleted_count = self.db.execute(query).scalar()
+        self.db.commit()
 
-        return len(notes_to_delete)
+        return deleted_count
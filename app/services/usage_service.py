@@ -5,11 +5,14 @@ Handles all usage tracking, limit enforcement, and monthly resets
 for free tier users.
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import event, or_, func, lambda_stmt, select, update
+from sqlalchemy.dialects.postgresql import insert
 from app.models.user import User, UsageTracking
 from app.models.note import EncryptedNote
 from typing import Dict, Optional
 from datetime import datetime
+from calendar import monthrange
+from uuid import UUID
 
 
 # Free tier limits (premium users have unlimited)
@@ -19,38 +22,90 @@ FREE_TIER_LIMITS = {
     "exports_month": 10,
 }
 
+# Current time in UTC as evaluated by the database, for set-based updates
+# (the timestamp columns hold naive UTC)
+_DB_UTC_NOW = func.timezone('utc', func.now())
+
 
 class UsageService:
     """Service for tracking user usage and enforcing rate limits"""
 
     def __init__(self, db: Session):
         self.db = db
+        # Tracking rows loaded by this service, keyed by user ID. A service
+        # lives for one request, and most gated paths (check, increment,
+        # report) touch the same row several times. The cache is only valid
+        # for what the session has committed or is about to commit, so it is
+        # cleared whenever the session rolls back.
+        self._tracking_cache: Dict[str, UsageTracking] = {}
+        event.listen(db, "after_rollback", self._on_rollback)
+
+    def reset(self) -> None:
+        """
+        Forget cached tracking rows.
+
+        Done automatically when the session rolls back: a row created in the
+        rolled-back transaction no longer exists, and reading the cached
+        (expired) instance would raise ObjectDeletedError.
+        """
+        self._tracking_cache.clear()
+
+    def _on_rollback(self, session: Session) -> None:
+        """Session after_rollback hook: invalidate the tracking cache"""
+        self.reset()
 
-    def get_or_create_usage_tracking(self, user_id: str) -> UsageTracking:
+    def _get_user(self, user_id: str) -> Optional[User]:
+        """
+        Get a user by ID via the session's identity map.
+
+        The authenticated user is already loaded in the request's session,
+        so this usually returns it without another SELECT on users.
+        """
+        return self.db.get(User, UUID(str(user_id)))
+
+    def get_or_create_usage_tracking(self, user_id: str, commit: bool = True) -> UsageTracking:
         """
         Get existing usage tracking record or create a new one.
 
+        The record is cached on the service, so repeated calls in a request
+        don't re-query it (after a commit it reloads by primary key).
+
         Args:
             user_id: User's UUID
+            commit: Commit a newly created record or monthly reset right away.
+                Pass False when the caller commits its own transaction.
 
         Returns:
             UsageTracking record
         """
-        tracking = self.db.query(UsageTracking).filter(
-            UsageTracking.user_id == user_id
-        ).first()
+        tracking = self._tracking_cache.get(str(user_id))
+
+        if tracking is None:
+            # lambda_stmt caches the constructed statement as well as its
+            # compiled SQL, so this per-request lookup skips query building
+            tracking = self.db.execute(
+                lambda_stmt(lambda: select(UsageTracking).where(UsageTracking.user_id == user_id))
+            ).scalars().first()
 
         if not tracking:
-            # Create new tracking record with defaults
-            tracking = UsageTracking(user_id=user_id)
-            self.db.add(tracking)
-            self.db.commit()
-            self.db.refresh(tracking)
+            # Create new tracking record with defaults. A concurrent request may
+            # create it first, so upsert and take whichever row ends up stored
+            # (the no-op update makes RETURNING yield the existing row too).
+            stmt = insert(UsageTracking).values(user_id=user_id)
+            tracking = self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[UsageTracking.user_id],
+                    set_={"user_id": stmt.excluded.user_id}
+                ).returning(UsageTracking)
+            ).scalars().one()
+            if commit:
+                self.db.commit()
+
+        self._tracking_cache[str(user_id)] = tracking
 
         # Check and reset monthly counters if needed
-        if tracking.check_and_reset_monthly():
+        if tracking.check_and_reset_monthly() and commit:
             self.db.commit()
-            self.db.refresh(tracking)
 
         return tracking
 
@@ -58,41 +113,77 @@ class UsageService:
         """
         Get comprehensive usage statistics for a user.
 
+        Premium users have no limits, so their counters are read with a
+        plain SELECT: no tracking record is created, reset or committed
+        (missing counters, and monthly ones from a past month, read as 0).
+
         Args:
             user_id: User's UUID
 
         Returns:
             Dict with usage stats for all tracked features
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = self._get_user(user_id)
         if not user:
             raise ValueError(f"User not found: {user_id}")
 
+        # Both monthly counters reset at the same time
+        resets_at = self._get_next_month_start().isoformat()
+
+        if user.is_premium:
+            counters = self.db.execute(
+                select(
+                    UsageTracking.synced_notes_count,
+                    UsageTracking.ocr_scans_month,
+                    UsageTracking.exports_month,
+                    UsageTracking.last_monthly_reset
+                ).where(UsageTracking.user_id == user_id)
+            ).first()
+
+            synced_notes = ocr_scans = exports = 0
+            if counters:
+                synced_notes = counters.synced_notes_count
+                # Same rule as UsageTracking.check_and_reset_monthly()
+                now = datetime.utcnow()
+                last_reset = counters.last_monthly_reset
+                if (now.year, now.month) <= (last_reset.year, last_reset.month):
+                    ocr_scans = counters.ocr_scans_month
+                    exports = counters.exports_month
+
+            unlimited = {"limit": -1, "unlimited": True, "remaining": -1}
+            return {
+                "is_premium": True,
+                "subscription_tier": user.subscription_tier,
+                "synced_notes": {**unlimited, "current": synced_notes},
+                "ocr_scans": {**unlimited, "current": ocr_scans, "resets_at": resets_at},
+                "exports": {**unlimited, "current": exports, "resets_at": resets_at},
+                "last_updated": datetime.utcnow().isoformat(),
+            }
+
         tracking = self.get_or_create_usage_tracking(user_id)
-        is_premium = user.is_premium
 
         return {
-            "is_premium": is_premium,
+            "is_premium": False,
             "subscription_tier": user.subscription_tier,
             "synced_notes": {
                 "current": tracking.synced_notes_count,
-                "limit": -1 if is_premium else FREE_TIER_LIMITS["synced_notes"],
-                "unlimited": is_premium,
-                "remaining": -1 if is_premium else max(0, FREE_TIER_LIMITS["synced_notes"] - tracking.synced_notes_count),
+                "limit": FREE_TIER_LIMITS["synced_notes"],
+                "unlimited": False,
+                "remaining": max(0, FREE_TIER_LIMITS["synced_notes"] - tracking.synced_notes_count),
             },
             "ocr_scans": {
                 "current": tracking.ocr_scans_month,
-                "limit": -1 if is_premium else FREE_TIER_LIMITS["ocr_scans_month"],
-                "unlimited": is_premium,
-                "remaining": -1 if is_premium else max(0, FREE_TIER_LIMITS["ocr_scans_month"] - tracking.ocr_scans_month),
-                "resets_at": self._get_next_month_start().isoformat(),
+                "limit": FREE_TIER_LIMITS["ocr_scans_month"],
+                "unlimited": False,
+                "remaining": max(0, FREE_TIER_LIMITS["ocr_scans_month"] - tracking.ocr_scans_month),
+                "resets_at": resets_at,
             },
             "exports": {
                 "current": tracking.exports_month,
-                "limit": -1 if is_premium else FREE_TIER_LIMITS["exports_month"],
-                "unlimited": is_premium,
-                "remaining": -1 if is_premium else max(0, FREE_TIER_LIMITS["exports_month"] - tracking.exports_month),
-                "resets_at": self._get_next_month_start().isoformat(),
+                "limit": FREE_TIER_LIMITS["exports_month"],
+                "unlimited": False,
+                "remaining": max(0, FREE_TIER_LIMITS["exports_month"] - tracking.exports_month),
+                "resets_at": resets_at,
             },
             "last_updated": tracking.updated_at.isoformat(),
         }
@@ -110,7 +201,7 @@ class UsageService:
         Returns:
             True if user can sync, False otherwise
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = self._get_user(user_id)
         if not user:
             return False
 
@@ -135,7 +226,7 @@ class UsageService:
         Returns:
             True if user can perform OCR, False otherwise
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = self._get_user(user_id)
         if not user:
             return False
 
@@ -160,7 +251,7 @@ class UsageService:
         Returns:
             True if user can export, False otherwise
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = self._get_user(user_id)
         if not user:
             return False
 
@@ -172,31 +263,53 @@ class UsageService:
         tracking = self.get_or_create_usage_tracking(user_id)
         return tracking.exports_month < FREE_TIER_LIMITS["exports_month"]
 
-    def increment_synced_notes(self, user_id: str, count: int = 1) -> None:
+    def _increment_monthly_counter(self, user_id: str, column, count: int) -> None:
         """
-        Increment the synced notes counter.
+        Add to a monthly counter with one atomic UPDATE.
 
-        Args:
-            user_id: User's UUID
-            count: Number to increment (default: 1)
+        The row is loaded first so it exists and this month's reset has been
+        applied; the increment itself is computed by the database, so
+        concurrent requests can't lose each other's updates.
         """
-        tracking = self.get_or_create_usage_tracking(user_id)
-        tracking.synced_notes_count += count
-        tracking.updated_at = datetime.utcnow()
+        self.get_or_create_usage_tracking(user_id)
+        self.db.execute(
+            update(UsageTracking)
+            .where(UsageTracking.user_id == user_id)
+            .values({column: column + count, UsageTracking.updated_at: _DB_UTC_NOW})
+            .execution_options(synchronize_session=False)
+        )
         self.db.commit()
 
-    def decrement_synced_notes(self, user_id: str, count: int = 1) -> None:
+    def claim_synced_notes(self, user_id: str, count: int) -> bool:
         """
-        Decrement the synced notes counter (when notes are deleted).
+        Atomically reserve synced note slots against the free tier limit.
+
+        The counter is only incremented if the result stays within the
+        limit, in a single conditional UPDATE. Does not commit: the claim
+        should commit together with the notes it counts.
 
         Args:
             user_id: User's UUID
-            count: Number to decrement (default: 1)
+            count: Number of new notes to claim
+
+        Returns:
+            True if the slots were claimed, False if the limit would be exceeded
         """
-        tracking = self.get_or_create_usage_tracking(user_id)
-        tracking.synced_notes_count = max(0, tracking.synced_notes_count - count)
-        tracking.updated_at = datetime.utcnow()
-        self.db.commit()
+        claimed = self.db.execute(
+            update(UsageTracking)
+            .where(
+                UsageTracking.user_id == user_id,
+                UsageTracking.synced_notes_count + count <= FREE_TIER_LIMITS["synced_notes"]
+            )
+            .values(
+                synced_notes_count=UsageTracking.synced_notes_count + count,
+                updated_at=_DB_UTC_NOW
+            )
+            .returning(UsageTracking.synced_notes_count)
+            .execution_options(synchronize_session=False)
+        ).first()
+
+        return claimed is not None
 
     def increment_ocr_scans(self, user_id: str, count: int = 1) -> None:
         """
@@ -206,10 +319,7 @@ class UsageService:
             user_id: User's UUID
             count: Number to increment (default: 1)
         """
-        tracking = self.get_or_create_usage_tracking(user_id)
-        tracking.ocr_scans_month += count
-        tracking.updated_at = datetime.utcnow()
-        self.db.commit()
+        self._increment_monthly_counter(user_id, UsageTracking.ocr_scans_month, count)
 
     def increment_exports(self, user_id: str, count: int = 1) -> None:
         """
@@ -219,10 +329,7 @@ class UsageService:
             user_id: User's UUID
             count: Number to increment (default: 1)
         """
-        tracking = self.get_or_create_usage_tracking(user_id)
-        tracking.exports_month += count
-        tracking.updated_at = datetime.utcnow()
-        self.db.commit()
+        self._increment_monthly_counter(user_id, UsageTracking.exports_month, count)
 
     def reconcile_synced_notes_count(self, user_id: str) -> int:
         """
@@ -239,22 +346,30 @@ class UsageService:
         """
         # Count actual non-deleted notes in database (excluding reminders)
         # Reminder notes are a free feature and don't count toward sync limits
-        actual_count = self.db.query(EncryptedNote).filter(
+        actual_count = select(func.count()).select_from(EncryptedNote).where(
             EncryptedNote.user_id == user_id,
             EncryptedNote.is_deleted == False,
             or_(
                 EncryptedNote.note_metadata['type'].astext != 'reminder',
                 EncryptedNote.note_metadata['type'].astext == None
             )
-        ).count()
-
-        # Update tracking record
-        tracking = self.get_or_create_usage_tracking(user_id)
-        tracking.synced_notes_count = actual_count
-        tracking.updated_at = datetime.utcnow()
+        ).scalar_subquery()
+
+        # Count and store in one statement (creating the tracking record if
+        # needed); the database returns the new value
+        stmt = insert(UsageTracking).values(user_id=user_id, synced_notes_count=actual_count)
+        new_count = self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[UsageTracking.user_id],
+                set_={
+                    "synced_notes_count": stmt.excluded.synced_notes_count,
+                    "updated_at": _DB_UTC_NOW,
+                }
+            ).returning(UsageTracking.synced_notes_count)
+        ).scalar_one()
         self.db.commit()
 
-        return actual_count
+        return new_count
 
     def set_synced_notes_count(self, user_id: str, count: int) -> None:
         """
@@ -271,8 +386,6 @@ class UsageService:
 
     def _get_next_month_start(self) -> datetime:
         """Get the start of next month (for reset countdown)."""
-        from calendar import monthrange
-
         now = datetime.utcnow()
         # Get the last day of current month
         last_day = monthrange(now.year, now.month)[1]
@@ -11,16 +11,20 @@ Handles subscription state changes from Google Play:
 - SUBSCRIPTION_EXPIRED: Subscription expired
 - SUBSCRIPTION_REVOKED: Subscription revoked (refund, etc.)
 """
+from fastapi import BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import exists, insert, select, update
 from app.models.device import Device
 from app.models.user import User
 from app.models.subscription import SubscriptionEvent
 from app.config import settings
+from app.database import SessionLocal
 from app.services.notification_service import NotificationService
+from app.services.payment_service import get_subscription_duration
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-import base64
+from typing import Optional, Dict, Any, Tuple
+from uuid import UUID
+from binascii import a2b_base64
 import json
 import logging
 
@@ -45,11 +49,39 @@ class SubscriptionNotificationType:
     SUBSCRIPTION_EXPIRED = 13
 
 
+# Human-readable names for notification types (for logging)
+_EVENT_TYPE_NAMES = {
+    1: "SUBSCRIPTION_RECOVERED",
+    2: "SUBSCRIPTION_RENEWED",
+    3: "SUBSCRIPTION_CANCELED",
+    4: "SUBSCRIPTION_PURCHASED",
+    5: "SUBSCRIPTION_ON_HOLD",
+    6: "SUBSCRIPTION_IN_GRACE_PERIOD",
+    7: "SUBSCRIPTION_RESTARTED",
+    8: "SUBSCRIPTION_PRICE_CHANGE_CONFIRMED",
+    9: "SUBSCRIPTION_DEFERRED",
+    10: "SUBSCRIPTION_PAUSED",
+    11: "SUBSCRIPTION_PAUSE_SCHEDULE_CHANGED",
+    12: "SUBSCRIPTION_REVOKED",
+    13: "SUBSCRIPTION_EXPIRED",
+}
+
+# raw_receipt marker stored with each webhook-logged subscription event
+_RAW_RECEIPT_BY_EVENT_TYPE = {
+    event_type: f'RTDN_WEBHOOK_{event_type.upper()}'
+    for event_type in (
+        'purchase_webhook', 'renewal', 'recovery', 'cancellation', 'on_hold',
+        'grace_period', 'expiration', 'revocation', 'restart',
+    )
+}
+
+
 class WebhookService:
     """Service for handling Google Play RTDN webhooks"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, background_tasks: Optional[BackgroundTasks] = None):
         self.db = db
+        self.background_tasks = background_tasks
 
     async def process_google_play_notification(self, message_data: Dict[str, Any]) -> Dict:
         """
@@ -60,6 +92,12 @@ class WebhookService:
         - message.messageId: Unique message ID
         - message.publishTime: When the message was published
 
+        Notifications are applied before the endpoint responds: the HTTP
+        response is Pub/Sub's acknowledgement, so queueing them in memory
+        and answering first would drop whatever is queued on a restart
+        (Pub/Sub would not redeliver). Pub/Sub pushes one message per
+        request, so there is no batch to coalesce within a call either.
+
         Args:
             message_data: The Pub/Sub push message
 
@@ -75,11 +113,12 @@ class WebhookService:
                 logger.warning("Empty notification data received")
                 return {"success": False, "error": "Empty notification data"}
 
-            # Decode base64 data
-            decoded_data = base64.b64decode(encoded_data).decode('utf-8')
-            notification = json.loads(decoded_data)
+            # Decode base64 data (json.loads takes the UTF-8 bytes directly)
+            notification = json.loads(a2b_base64(encoded_data))
 
-            logger.info(f"Processing Google Play notification: {json.dumps(notification, default=str)}")
+            # Full payload at DEBUG only (lazy %-formatting: never rendered
+            # otherwise); the handler logs the event type at INFO
+            logger.debug("Processing Google Play notification: %s", notification)
 
             # Extract subscription notification
             subscription_notification = notification.get('subscriptionNotification', {})
@@ -133,100 +172,129 @@ class WebhookService:
         Returns:
             Dict with handling result
         """
-        # Find device by purchase token
-        device = self.db.query(Device).filter(
-            Device.last_purchase_token == purchase_token
-        ).first()
-
-        # Find user by purchase token
-        user = self.db.query(User).filter(
-            User.google_play_purchase_token == purchase_token
-        ).first()
-
-        if not device and not user:
-            logger.warning(f"No device or user found for purchase token: {purchase_token[:20]}...")
-            # Still return success to acknowledge the notification
-            return {"success": True, "message": "No matching device/user found, notification ignored"}
-
         event_type = self._get_event_type_name(notification_type)
-        logger.info(f"Handling {event_type} for device={device.device_id if device else None}, user={user.id if user else None}")
+        logger.info(f"Handling {event_type} for purchase token: {purchase_token[:20]}...")
 
         # Route to appropriate handler
-        if notification_type == SubscriptionNotificationType.SUBSCRIPTION_PURCHASED:
-            return await self._handle_purchase(device, user, subscription_id, purchase_token)
-
-        elif notification_type == SubscriptionNotificationType.SUBSCRIPTION_RENEWED:
-            return await self._handle_renewal(device, user, subscription_id)
+        handler = self._HANDLERS.get(notification_type)
+        if handler is None:
+            logger.info(f"Unhandled notification type: {notification_type}")
+            return {"success": True, "message": f"Notification type {notification_type} not handled"}
 
-        elif notification_type == SubscriptionNotificationType.SUBSCRIPTION_RECOVERED:
-            return await self._handle_recovery(device, user, subscription_id)
+        return await handler(self, purchase_token, subscription_id)
 
-        elif notification_type == SubscriptionNotificationType.SUBSCRIPTION_CANCELED:
-            return await self._handle_cancellation(device, user)
+    def _update_subscription(
+        self,
+        purchase_token: str,
+        device_values: Dict[str, Any],
+        user_values: Dict[str, Any]
+    ) -> Tuple[bool, Optional[UUID]]:
+        """
+        Apply subscription changes to the device and user holding a purchase token
 
-        elif notification_type == SubscriptionNotificationType.SUBSCRIPTION_ON_HOLD:
-            return await self._handle_on_hold(device, user)
+        Each side is a single UPDATE, so rows are never loaded just to be
+        modified. With no values for a side, its match is only looked up;
+        with no values at all, both lookups share one round trip.
 
-        elif notification_type == SubscriptionNotificationType.SUBSCRIPTION_IN_GRACE_PERIOD:
-            return await self._handle_grace_period(device, user)
+        Args:
+            purchase_token: Google Play purchase token
+            device_values: Column values to set on the matching device
+            user_values: Column values to set on the matching user
 
-        elif notification_type == SubscriptionNotificationType.SUBSCRIPTION_EXPIRED:
-            return await self._handle_expiration(device, user)
+        Returns:
+            Tuple of (whether a device or user matched, matching user's ID)
+        """
+        if not device_values and not user_values:
+            user_id, device_matched = self.db.execute(
+                select(
+                    select(User.id)
+                    .where(User.google_play_purchase_token == purchase_token)
+                    .limit(1)
+                    .scalar_subquery(),
+                    exists().where(Device.last_purchase_token == purchase_token)
+                )
+            ).one()
+            return device_matched or user_id is not None, user_id
+
+        if device_values:
+            device_matched = self.db.execute(
+                update(Device)
+                .where(Device.last_purchase_token == purchase_token)
+                .values(**device_values)
+                .execution_options(synchronize_session=False)
+            ).rowcount > 0
+        else:
+            device_matched = self.db.execute(
+                select(Device.id).where(Device.last_purchase_token == purchase_token).limit(1)
+            ).first() is not None
+
+        if user_values:
+            user_id = self.db.execute(
+                update(User)
+                .where(User.google_play_purchase_token == purchase_token)
+                .values(**user_values)
+                .returning(User.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().first()
+        else:
+            user_id = self.db.execute(
+                select(User.id).where(User.google_play_purchase_token == purchase_token).limit(1)
+            ).scalar()
 
-        elif notification_type == SubscriptionNotificationType.SUBSCRIPTION_REVOKED:
-            return await self._handle_revocation(device, user)
+        return device_matched or user_id is not None, user_id
 
-        elif notification_type == SubscriptionNotificationType.SUBSCRIPTION_RESTARTED:
-            return await self._handle_restart(device, user, subscription_id)
-
-        else:
-            logger.info(f"Unhandled notification type: {notification_type}")
-            return {"success": True, "message": f"Notification type {notification_type} not handled"}
+    def _no_match(self, purchase_token: str) -> Dict:
+        """Result for a notification whose purchase token matches no device or user"""
+        self.db.rollback()
+        logger.warning(f"No device or user found for purchase token: {purchase_token[:20]}...")
+        # Still return success to acknowledge the notification
+        return {"success": True, "message": "No matching device/user found, notification ignored"}
 
     async def _handle_purchase(
         self,
-        device: Optional[Device],
-        user: Optional[User],
-        subscription_id: str,
-        purchase_token: str
+        purchase_token: str,
+        subscription_id: str
     ) -> Dict:
         """Handle new subscription purchase"""
         # This is usually handled by the verify endpoint, but we can update here too
-        if device:
-            device.subscription_tier = 'premium'
-            device.subscription_product_id = subscription_id
-            device.last_purchase_token = purchase_token
-            device.clear_grace_period()
-
-        if user:
-            user.subscription_tier = 'premium'
-            user.google_play_purchase_token = purchase_token
-            user.grace_period_ends_at = None
-
-        self._log_event(user, 'purchase_webhook', subscription_id)
+        matched, user_id = self._update_subscription(
+            purchase_token,
+            device_values={
+                "subscription_tier": 'premium',
+                "subscription_product_id": subscription_id,
+                "grace_period_ends_at": None,
+            },
+            user_values={
+                "subscription_tier": 'premium',
+                "grace_period_ends_at": None,
+            }
+        )
+        if not matched:
+            return self._no_match(purchase_token)
+
+        self._log_event(user_id, 'purchase_webhook', subscription_id)
         self.db.commit()
 
         return {"success": True, "message": "Purchase notification processed"}
 
     async def _handle_renewal(
         self,
-        device: Optional[Device],
-        user: Optional[User],
+        purchase_token: str,
         subscription_id: str
     ) -> Dict:
         """Handle subscription renewal"""
         # Calculate new expiration based on product
         new_expiry = self._calculate_expiry(subscription_id)
 
-        if device:
-            device.subscription_expires_at = new_expiry
-            device.clear_grace_period()
-
-        if user:
-            user.subscription_expires_at = new_expiry
-            user.grace_period_ends_at = None
+        matched, user_id = self._update_subscription(
+            purchase_token,
+            device_values={"subscription_expires_at": new_expiry, "grace_period_ends_at": None},
+            user_values={"subscription_expires_at": new_expiry, "grace_period_ends_at": None}
+        )
+        if not matched:
+            return self._no_match(purchase_token)
 
-        self._log_event(user, 'renewal', subscription_id)
+        self._log_event(user_id, 'renewal', subscription_id)
         self.db.commit()
 
         logger.info(f"Subscription renewed until {new_expiry}")
@@ -234,24 +302,22 @@ class WebhookService:
 
     async def _handle_recovery(
         self,
-        device: Optional[Device],
-        user: Optional[User],
+        purchase_token: str,
         subscription_id: str
     ) -> Dict:
         """Handle recovery from grace period/hold"""
         new_expiry = self._calculate_expiry(subscription_id)
+        values = {
+            "subscription_tier": 'premium',
+            "subscription_expires_at": new_expiry,
+            "grace_period_ends_at": None,
+        }
 
-        if device:
-            device.subscription_tier = 'premium'
-            device.subscription_expires_at = new_expiry
-            device.clear_grace_period()
-
-        if user:
-            user.subscription_tier = 'premium'
-            user.subscription_expires_at = new_expiry
-            user.grace_period_ends_at = None
+        matched, user_id = self._update_subscription(purchase_token, values, values)
+        if not matched:
+            return self._no_match(purchase_token)
 
-        self._log_event(user, 'recovery', subscription_id)
+        self._log_event(user_id, 'recovery', subscription_id)
         self.db.commit()
 
         logger.info("Subscription recovered from grace period")
@@ -259,12 +325,16 @@ class WebhookService:
 
     async def _handle_cancellation(
         self,
-        device: Optional[Device],
-        user: Optional[User]
+        purchase_token: str,
+        subscription_id: str
     ) -> Dict:
         """Handle subscription cancellation (user canceled, will expire at end of period)"""
         # Note: User still has access until expiration, just mark that renewal won't happen
-        self._log_event(user, 'cancellation', None)
+        matched, user_id = self._update_subscription(purchase_token, {}, {})
+        if not matched:
+            return self._no_match(purchase_token)
+
+        self._log_event(user_id, 'cancellation', None)
         self.db.commit()
 
         logger.info("Subscription canceled (will expire at end of billing period)")
@@ -272,175 +342,202 @@ class WebhookService:
 
     async def _handle_on_hold(
         self,
-        device: Optional[Device],
-        user: Optional[User]
+        purchase_token: str,
+        subscription_id: str
     ) -> Dict:
         """Handle subscription on hold (payment failed severely)"""
         # Start grace period
         grace_days = getattr(settings, 'GRACE_PERIOD_DAYS', 3)
+        values = {"grace_period_ends_at": datetime.utcnow() + timedelta(days=grace_days)}
 
-        if device:
-            device.start_grace_period(grace_days)
-
-        if user:
-            user.start_grace_period(grace_days)
-            # Send push notification
-            await self._send_payment_failure_notification(user)
+        matched, user_id = self._update_subscription(purchase_token, values, values)
+        if not matched:
+            return self._no_match(purchase_token)
 
-        self._log_event(user, 'on_hold', None)
+        self._log_event(user_id, 'on_hold', None)
         self.db.commit()
 
+        if user_id:
+            # Send push notification
+            await self._send_payment_failure_notification(user_id)
+
         logger.info(f"Subscription on hold, grace period started ({grace_days} days)")
         return {"success": True, "message": "On-hold processed, grace period started"}
 
     async def _handle_grace_period(
         self,
-        device: Optional[Device],
-        user: Optional[User]
+        purchase_token: str,
+        subscription_id: str
     ) -> Dict:
         """Handle subscription entering grace period (payment failed but retrying)"""
         grace_days = getattr(settings, 'GRACE_PERIOD_DAYS', 3)
+        values = {"grace_period_ends_at": datetime.utcnow() + timedelta(days=grace_days)}
 
-        if device:
-            device.start_grace_period(grace_days)
-
-        if user:
-            user.start_grace_period(grace_days)
-            # Send push notification
-            await self._send_payment_failure_notification(user)
+        matched, user_id = self._update_subscription(purchase_token, values, values)
+        if not matched:
+            return self._no_match(purchase_token)
 
-        self._log_event(user, 'grace_period', None)
+        self._log_event(user_id, 'grace_period', None)
         self.db.commit()
 
+        if user_id:
+            # Send push notification
+            await self._send_payment_failure_notification(user_id)
+
         logger.info(f"Subscription in grace period ({grace_days} days)")
         return {"success": True, "message": "Grace period started"}
 
     async def _handle_expiration(
         self,
-        device: Optional[Device],
-        user: Optional[User]
+        purchase_token: str,
+        subscription_id: str
     ) -> Dict:
         """Handle subscription expiration"""
-        if device:
-            device.subscription_tier = 'free'
-            device.grace_period_ends_at = None
-
-        if user:
-            user.subscription_tier = 'free'
-            user.grace_period_ends_at = None
-
-        self._log_event(user, 'expiration', None)
-        self.db.commit()
-
-        logger.info("Subscription expired")
-        return {"success": True, "message": "Expiration processed"}
+        return self._end_subscription(purchase_token, revoked=False)
 
     async def _handle_revocation(
         self,
-        device: Optional[Device],
-        user: Optional[User]
+        purchase_token: str,
+        subscription_id: str
     ) -> Dict:
         """Handle subscription revocation (refund, abuse, etc.)"""
-        if device:
-            device.subscription_tier = 'free'
-            device.subscription_expires_at = None
-            device.grace_period_ends_at = None
+        return self._end_subscription(purchase_token, revoked=True)
 
-        if user:
-            user.subscription_tier = 'free'
-            user.subscription_expires_at = None
-            user.grace_period_ends_at = None
+    def _end_subscription(self, purchase_token: str, revoked: bool) -> Dict:
+        """
+        Downgrade the device and user holding a purchase token to free
+
+        Shared by expiration and revocation: one UPDATE per table plus the
+        event insert, committed together. A revocation also clears the
+        expiry date; an expired subscription keeps it for reference.
+        """
+        values = {"subscription_tier": 'free', "grace_period_ends_at": None}
+        if revoked:
+            values["subscription_expires_at"] = None
 
-        self._log_event(user, 'revocation', None)
+        matched, user_id = self._update_subscription(purchase_token, values, values)
+        if not matched:
+            return self._no_match(purchase_token)
+
+        self._log_event(user_id, 'revocation' if revoked else 'expiration', None)
         self.db.commit()
 
-        logger.info("Subscription revoked")
-        return {"success": True, "message": "Revocation processed"}
+        if revoked:
+            logger.info("Subscription revoked")
+            return {"success": True, "message": "Revocation processed"}
+
+        logger.info("Subscription expired")
+        return {"success": True, "message": "Expiration processed"}
 
     async def _handle_restart(
         self,
-        device: Optional[Device],
-        user: Optional[User],
+        purchase_token: str,
         subscription_id: str
     ) -> Dict:
         """Handle subscription restart (user re-subscribed)"""
         new_expiry = self._calculate_expiry(subscription_id)
+        values = {
+            "subscription_tier": 'premium',
+            "subscription_expires_at": new_expiry,
+            "grace_period_ends_at": None,
+        }
 
-        if device:
-            device.subscription_tier = 'premium'
-            device.subscription_expires_at = new_expiry
-            device.clear_grace_period()
-
-        if user:
-            user.subscription_tier = 'premium'
-            user.subscription_expires_at = new_expiry
-            user.grace_period_ends_at = None
+        matched, user_id = self._update_subscription(purchase_token, values, values)
+        if not matched:
+            return self._no_match(purchase_token)
 
-        self._log_event(user, 'restart', subscription_id)
+        self._log_event(user_id, 'restart', subscription_id)
         self.db.commit()
 
         logger.info("Subscription restarted")
         return {"success": True, "message": "Restart processed"}
 
+    # Handler for each notification type (all take purchase_token, subscription_id)
+    _HANDLERS = {
+        SubscriptionNotificationType.SUBSCRIPTION_PURCHASED: _handle_purchase,
+        SubscriptionNotificationType.SUBSCRIPTION_RENEWED: _handle_renewal,
+        SubscriptionNotificationType.SUBSCRIPTION_RECOVERED: _handle_recovery,
+        SubscriptionNotificationType.SUBSCRIPTION_CANCELED: _handle_cancellation,
+        SubscriptionNotificationType.SUBSCRIPTION_ON_HOLD: _handle_on_hold,
+        SubscriptionNotificationType.SUBSCRIPTION_IN_GRACE_PERIOD: _handle_grace_period,
+        SubscriptionNotificationType.SUBSCRIPTION_EXPIRED: _handle_expiration,
+        SubscriptionNotificationType.SUBSCRIPTION_REVOKED: _handle_revocation,
+        SubscriptionNotificationType.SUBSCRIPTION_RESTARTED: _handle_restart,
+    }
+
     def _calculate_expiry(self, subscription_id: str) -> Optional[datetime]:
         """Calculate subscription expiry based on product ID"""
-        if not subscription_id:
-            return datetime.utcnow() + timedelta(days=30)
-
-        if 'lifetime' in subscription_id:
-            return None  # No expiry
-        elif 'yearly' in subscription_id:
-            return datetime.utcnow() + timedelta(days=365)
-        elif 'monthly' in subscription_id:
-            return datetime.utcnow() + timedelta(days=30)
-        else:
-            return datetime.utcnow() + timedelta(days=30)
+        duration = get_subscription_duration(subscription_id)
+        return datetime.utcnow() + duration if duration else None
 
     def _log_event(
         self,
-        user: Optional[User],
+        user_id: Optional[UUID],
         event_type: str,
         product_id: Optional[str]
     ) -> None:
-        """Log a subscription event"""
-        event = SubscriptionEvent(
-            user_id=str(user.id) if user else None,
-            event_type=event_type,
-            product_id=product_id,
-            platform='android',
-            raw_receipt=f'RTDN_WEBHOOK_{event_type.upper()}'
-        )
-        self.db.add(event)
+        """
+        Log a subscription event
 
-    async def _send_payment_failure_notification(self, user: User) -> None:
-        """Send push notification about payment failure"""
-        try:
-            notification_service = NotificationService(self.db)
-            await notification_service.send_notification_to_user(
-                user_id=str(user.id),
-                title="Payment Failed",
-                body="Your payment failed. Please update your payment method within 3 days to keep premium access.",
-                data={"type": "payment_failure", "action": "open_subscription"}
+        Inserted with a Core INSERT in the webhook's transaction (the row is
+        never read back, so it skips the unit of work). Events belong to a
+        user, so nothing is logged when only a device holds the token.
+        """
+        if user_id is None:
+            return
+
+        self.db.execute(
+            insert(SubscriptionEvent).values(
+                user_id=user_id,
+                event_type=event_type,
+                product_id=product_id,
+                platform='android',
+                raw_receipt=_RAW_RECEIPT_BY_EVENT_TYPE[event_type]
             )
-            logger.info(f"Sent payment failure notification to user {user.id}")
-        except Exception as e:
-            logger.error(f"Failed to send payment failure notification: {e}")
+        )
+
+    async def _send_payment_failure_notification(self, user_id: UUID) -> None:
+        """
+        Send push notification about payment failure
+
+        The state change is already committed, and the push is best-effort.
+        With background_tasks (the webhook endpoint), it is sent after the
+        response so FCM latency never delays the Pub/Sub acknowledgement.
+        """
+        if self.background_tasks is not None:
+            self.background_tasks.add_task(_send_payment_failure_push, user_id)
+        else:
+            await _send_payment_failure_push(user_id, self.db)
 
     def _get_event_type_name(self, notification_type: int) -> str:
         """Get human-readable name for notification type"""
-        names = {
-            1: "SUBSCRIPTION_RECOVERED",
-            2: "SUBSCRIPTION_RENEWED",
-            3: "SUBSCRIPTION_CANCELED",
-            4: "SUBSCRIPTION_PURCHASED",
-            5: "SUBSCRIPTION_ON_HOLD",
-            6: "SUBSCRIPTION_IN_GRACE_PERIOD",
-            7: "SUBSCRIPTION_RESTARTED",
-            8: "SUBSCRIPTION_PRICE_CHANGE_CONFIRMED",
-            9: "SUBSCRIPTION_DEFERRED",
-            10: "SUBSCRIPTION_PAUSED",
-            11: "SUBSCRIPTION_PAUSE_SCHEDULE_CHANGED",
-            12: "SUBSCRIPTION_REVOKED",
-            13: "SUBSCRIPTION_EXPIRED",
-        }
-        return names.get(notification_type, f"UNKNOWN_{notification_type}")
+        return _EVENT_TYPE_NAMES.get(notification_type, f"UNKNOWN_{notification_type}")
+
+
+async def _send_payment_failure_push(user_id: UUID, db: Optional[Session] = None) -> None:
+    """
+    Push a payment failure notice to all of a user's devices
+
+    Args:
+        user_id: User to notify
+        db: Session to use; a background send (after the request's session
+            is closed) opens its own
+    """
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
+
+    try:
+        notification_service = NotificationService(db)
+        await notification_service.send_notification_to_user(
+            user_id=str(user_id),
+            title="Payment Failed",
+            body="Your payment failed. Please update your payment method within 3 days to keep premium access.",
+            data={"type": "payment_failure", "action": "open_subscription"}
+        )
+        logger.info(f"Sent payment failure notification to user {user_id}")
+    except Exception as e:
+        logger.error(f"Failed to send payment failure notification: {e}")
+    finally:
+        if own_session:
+            db.close()
@@ -1,6 +1,9 @@
 """Tasks for reminder notifications"""
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from collections import defaultdict
 from datetime import datetime
+from typing import Dict
 from uuid import UUID
 import logging
 import asyncio
@@ -13,6 +16,28 @@ from app.services.notification_service import NotificationService
 logger = logging.getLogger(__name__)
 
 
+# Overdue reminders claimed and sent per batch by the catch-up check
+MISSED_REMINDER_BATCH_SIZE = 500
+
+
+def _build_reminder_notification(reminder: Reminder) -> Dict:
+    """Build the push notification (title, body, data) for a reminder"""
+    # Use notification_title and notification_content (new fields)
+    notification_title = reminder.notification_title or reminder.title or "Reminder"
+    notification_body = reminder.notification_content or reminder.description or "Reminder notification"
+
+    return {
+        "title": f"⏰ {notification_title}",
+        "body": notification_body,
+        "data": {
+            "type": "reminder",
+            "reminder_id": str(reminder.id),
+            "note_uuid": reminder.note_uuid,
+            "action": "open_note"
+        },
+    }
+
+
 def send_reminder_notification(reminder_id: str):
     """
     Send FCM push notification for a reminder to all user devices
@@ -34,13 +59,17 @@ def send_reminder_notification(reminder_id: str):
     db: Session = SessionLocal()
 
     try:
-        # Get the reminder
+        # Claim the reminder: the row stays locked until mark_triggered is
+        # committed, and a reminder already being sent elsewhere (scheduled
+        # job vs. catch-up, or another instance) is skipped rather than re-sent
         reminder = db.query(Reminder).filter(
             Reminder.id == UUID(reminder_id)
-        ).first()
+        ).with_for_update(skip_locked=True).first()
 
+        # Deleted since scheduling (cancellation is best-effort) or claimed by
+        # another worker - nothing to send
         if not reminder:
-            logger.error(f"Reminder {reminder_id} not found")
+            logger.info(f"Reminder {reminder_id} not found or already being sent, skipping")
             return {
                 "success": False,
                 "message": f"Reminder {reminder_id} not found"
@@ -74,35 +103,22 @@ def send_reminder_notification(reminder_id: str):
         sent_count = 0
         failed_count = 0
 
-        for token in fcm_tokens:
-            try:
-                # Use notification_title and notification_content (new fields)
-                notification_title = reminder.notification_title or reminder.title or "Reminder"
-                notification_body = reminder.notification_content or reminder.description or "Reminder notification"
-
-                # Run the async send_notification method
-                result = asyncio.run(notification_service.send_notification(
-                    fcm_token=token.fcm_token,
-                    title=f"⏰ {notification_title}",
-                    body=notification_body,
-                    data={
-                        "type": "reminder",
-                        "reminder_id": str(reminder.id),
-                        "note_uuid": reminder.note_uuid,
-                        "action": "open_note"
-                    }
-                ))
+        # Same payload for every device - build it once
+        notification = _build_reminder_notification(reminder)
 
-                if result.get("success"):
-                    sent_count += 1
-                    logger.info(f"Sent reminder to device {token.device_id}")
-                else:
-                    failed_count += 1
-                    logger.error(f"Failed to send to device {token.device_id}: {result.get('message')}")
+        # One multicast request for all of the user's devices
+        results = asyncio.run(notification_service.send_multicast(
+            fcm_tokens=[token.fcm_token for token in fcm_tokens],
+            **notification
+        ))
 
-            except Exception as e:
+        for token, result in zip(fcm_tokens, results):
+            if result.get("success"):
+                sent_count += 1
+                logger.info(f"Sent reminder to device {token.device_id}")
+            else:
                 failed_count += 1
-                logger.error(f"Error sending to device {token.device_id}: {e}")
+                logger.error(f"Failed to send to device {token.device_id}: {result.get('message')}")
 
         # Mark reminder as triggered
         reminder.mark_triggered()
@@ -141,6 +157,12 @@ def check_missed_reminders():
     - Reminders during server downtime
     - Any other edge cases
 
+    Overdue reminders are handled in batches: each batch is claimed with
+    FOR UPDATE SKIP LOCKED (so reminders a scheduled job is sending right
+    now are skipped), their users' FCM tokens are loaded in one query, each
+    reminder goes out as one multicast (all sent concurrently), and the
+    batch is marked triggered with one UPDATE and one commit.
+
     Returns:
         Dictionary with number of triggered reminders
     """
@@ -148,24 +170,73 @@ def check_missed_reminders():
     triggered_count = 0
 
     try:
-        # Get all reminders that are past due but not triggered
         now = datetime.utcnow()
-        missed_reminders = db.query(Reminder).filter(
-            Reminder.is_triggered == False,
-            Reminder.reminder_time <= now
-        ).all()
-
-        logger.info(f"Found {len(missed_reminders)} missed reminders")
+        notification_service = None
+
+        while True:
+            # Claim the next batch. Committed batches no longer match and
+            # locked rows are skipped, so this always makes progress.
+            reminders = db.query(Reminder).filter(
+                Reminder.is_triggered == False,
+                Reminder.reminder_time <= now
+            ).order_by(Reminder.reminder_time).with_for_update(
+                skip_locked=True
+            ).limit(MISSED_REMINDER_BATCH_SIZE).all()
+
+            if not reminders:
+                break
+
+            if notification_service is None:
+                notification_service = NotificationService(db)
+
+            # FCM tokens for every user in the batch, in one query
+            tokens_by_user = defaultdict(list)
+            for token in db.query(FCMToken).filter(
+                FCMToken.user_id.in_({reminder.user_id for reminder in reminders})
+            ):
+                tokens_by_user[token.user_id].append(token)
+
+            # One multicast per reminder (to all of its user's devices),
+            # with the reminders in the batch sent concurrently
+            sends = [
+                (reminder, tokens_by_user[reminder.user_id])
+                for reminder in reminders
+                if tokens_by_user[reminder.user_id]
+            ]
+
+            async def send_batch():
+                return await asyncio.gather(*(
+                    notification_service.send_multicast(
+                        fcm_tokens=[token.fcm_token for token in tokens],
+                        **_build_reminder_notification(reminder)
+                    )
+                    for reminder, tokens in sends
+                ))
 
-        for reminder in missed_reminders:
-            try:
-                # Trigger the reminder immediately
-                send_reminder_notification(str(reminder.id))
-                triggered_count += 1
-                logger.info(f"Sent missed reminder {reminder.id}")
+            results = asyncio.run(send_batch()) if sends else []
+
+            device_count = 0
+            for (reminder, tokens), reminder_results in zip(sends, results):
+                device_count += len(tokens)
+                for token, result in zip(tokens, reminder_results):
+                    if not result.get("success"):
+                        logger.error(
+                            f"Failed to send missed reminder {reminder.id} "
+                            f"to device {token.device_id}: {result.get('message')}"
+                        )
+
+            # Mark the whole batch as triggered (reminders without devices too)
+            triggered_at = datetime.utcnow()
+            db.execute(
+                update(Reminder)
+                .where(Reminder.id.in_([reminder.id for reminder in reminders]))
+                .values(is_triggered=True, triggered_at=triggered_at, updated_at=triggered_at)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
 
-            except Exception as e:
-                logger.error(f"Failed to send missed reminder {reminder.id}: {e}")
+            triggered_count += len(reminders)
+            logger.info(f"Sent {len(reminders)} missed reminder(s) to {device_count} device(s)")
 
         return {
             "success": True,
@@ -175,6 +246,7 @@ def check_missed_reminders():
 
     except Exception as e:
         logger.error(f"Error in check_missed_reminders: {e}")
+        db.rollback()
         return {
             "success": False,
             "message": f"Error: {str(e)}"
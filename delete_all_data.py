@@ -5,94 +5,101 @@ Delete all data from PinPoint database (preserves structure)
 This script will:
 1. Show current row counts for all tables
 2. Ask for confirmation
-3. Delete all data using TRUNCATE CASCADE
-4. Show final row counts to verify deletion
+3. Delete all data using a single TRUNCATE
+4. With --verify, show final row counts to verify deletion
 """
+import argparse
 import sys
-import os
 
-# Fix encoding for Windows console
+# Fix encoding for Windows console (in-process, no chcp subprocess)
 if sys.platform == "win32":
-    os.system("chcp 65001 >nul 2>&1")
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+    sys.stderr.reconfigure(encoding="utf-8", errors="replace")
 
 from sqlalchemy import text
-from app.database import engine
-
-def get_row_counts():
+from app.database import Base, engine
+# Register every model on Base.metadata
+import app.models
+import app.models.admin
+import app.models.folder
+
+# Every table in the schema (alembic_version is not a model, so it's kept),
+# children before parents
+TABLES = [table.name for table in reversed(Base.metadata.sorted_tables)]
+
+# One UNION ALL query, built once: all counts come back in a single round trip
+ROW_COUNTS_QUERY = text("\nUNION ALL\n".join(
+    f"SELECT '{table}', COUNT(*) FROM {table}" for table in TABLES
+))
+
+def get_row_counts(conn):
     """Get row count for each table"""
-    tables = [
-        'users',
-        'encrypted_notes',
-        'encryption_keys',
-        'devices',
-        'sync_events',
-        'subscription_events',
-        'fcm_tokens',
-        'admin_audit_logs'
-    ]
-
-    counts = {}
-    with engine.connect() as conn:
-        for table in tables:
-            result = conn.execute(text(f"SELECT COUNT(*) FROM {table}"))
-            counts[table] = result.scalar()
-
-    return counts
-
-def delete_all_data():
-    """Delete all data from all tables"""
-    sql = """
-    -- Disable triggers temporarily
-    SET session_replication_role = 'replica';
-
-    -- Delete data from all tables
-    TRUNCATE TABLE admin_audit_logs CASCADE;
-    TRUNCATE TABLE fcm_tokens CASCADE;
-    TRUNCATE TABLE subscription_events CASCADE;
-    TRUNCATE TABLE sync_events CASCADE;
-    TRUNCATE TABLE encrypted_notes CASCADE;
-    TRUNCATE TABLE encryption_keys CASCADE;
-    TRUNCATE TABLE devices CASCADE;
-    TRUNCATE TABLE users CASCADE;
-
-    -- Re-enable triggers
-    SET session_replication_role = 'origin';
-    """
+    return dict(conn.execute(ROW_COUNTS_QUERY).fetchall())
 
-    with engine.begin() as conn:
-        # Execute each statement separately
-        conn.execute(text("SET session_replication_role = 'replica'"))
-        conn.execute(text("TRUNCATE TABLE admin_audit_logs CASCADE"))
-        conn.execute(text("TRUNCATE TABLE fcm_tokens CASCADE"))
-        conn.execute(text("TRUNCATE TABLE subscription_events CASCADE"))
-        conn.execute(text("TRUNCATE TABLE sync_events CASCADE"))
-        conn.execute(text("TRUNCATE TABLE encrypted_notes CASCADE"))
-        conn.execute(text("TRUNCATE TABLE encryption_keys CASCADE"))
-        conn.execute(text("TRUNCATE TABLE devices CASCADE"))
-        conn.execute(text("TRUNCATE TABLE users CASCADE"))
-        conn.execute(text("SET session_replication_role = 'origin'"))
+def get_estimated_row_counts(conn):
+    """
+    Get approximate row count for each table from planner statistics
 
-    print("[OK] All data deleted successfully!")
+    Reads pg_class.reltuples instead of scanning the tables. Tables that
+    have never been vacuumed or analyzed report -1, shown here as 0.
+    """
+    result = conn.execute(
+        text(
+            "SELECT relname, GREATEST(reltuples, 0)::bigint FROM pg_class "
+            "WHERE relname = ANY(:tables) AND relkind = 'r' AND pg_table_is_visible(oid)"
+        ),
+        {"tables": TABLES}
+    )
+    estimates = dict(result.fetchall())
+
+    return {table: estimates.get(table, 0) for table in TABLES}
+
+def delete_all_data(conn):
+    """Delete all data from all tables (commits with the caller's transaction)"""
+    # One TRUNCATE takes every table's lock at once and empties them together.
+    # Every referencing table is in TABLES, so no CASCADE is needed (and a
+    # table missing from the models makes it fail instead of being emptied
+    # silently). TRUNCATE fires no ON DELETE triggers, so they don't need
+    # disabling (if ON TRUNCATE triggers are ever added, use SET LOCAL
+    # session_replication_role in this transaction).
+    conn.execute(text(
+        f"TRUNCATE TABLE {', '.join(TABLES)} RESTART IDENTITY"
+    ))
 
 def main():
+    parser = argparse.ArgumentParser(description="Delete all data from PinPoint database")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="count rows again after TRUNCATE (normally redundant: TRUNCATE empties every table or fails)"
+    )
+    args = parser.parse_args()
+
     print("=" * 60)
     print("WARNING: DELETE ALL DATA FROM PINPOINT DATABASE")
     print("=" * 60)
     print()
 
-    # Show current counts
-    print("Current row counts:")
+    # Show current counts (estimates: exact counts would scan every table)
+    print("Current row counts (approximate):")
     print("-" * 40)
-    counts_before = get_row_counts()
-    total_rows = 0
-    for table, count in counts_before.items():
-        print(f"  {table:25s} : {count:>6,} rows")
-        total_rows += count
+    # Read connection is closed before the prompt (no transaction left idle)
+    with engine.connect() as conn:
+        counts_before = get_estimated_row_counts(conn)
+        # Statistics can lag behind recent writes - confirm emptiness exactly
+        is_empty = (
+            sum(counts_before.values()) == 0
+            and sum(get_row_counts(conn).values()) == 0
+        )
+
+    # Build the report and print it in one call
+    print("\n".join(f"  {table:25s} : ~{count:>6,} rows" for table, count in counts_before.items()))
+    total_rows = sum(counts_before.values())
     print("-" * 40)
-    print(f"  {'TOTAL':25s} : {total_rows:>6,} rows")
+    print(f"  {'TOTAL':25s} : ~{total_rows:>6,} rows")
     print()
 
-    if total_rows == 0:
+    if is_empty:
         print("[OK] Database is already empty!")
         return
 
@@ -112,16 +119,25 @@ def main():
 
     print()
     print("Deleting all data...")
-    delete_all_data()
+    # Truncate (and optionally verify) in one transaction
+    with engine.begin() as conn:
+        delete_all_data(conn)
+        counts_after = get_row_counts(conn) if args.verify else None
+    print("[OK] All data deleted successfully!")
+
+    if counts_after is None:
+        print()
+        print("[SUCCESS] TRUNCATE completed. Run with --verify to recount rows.")
+        return
 
     # Verify deletion
     print()
     print("Final row counts:")
     print("-" * 40)
-    counts_after = get_row_counts()
-    for table, count in counts_after.items():
-        status = "[OK]" if count == 0 else "[ERROR]"
-        print(f"  {status} {table:25s} : {count:>6,} rows")
+    print("\n".join(
+        f"  {'[OK]' if count == 0 else '[ERROR]'} {table:25s} : {count:>6,} rows"
+        for table, count in counts_after.items()
+    ))
     print("-" * 40)
 
     # Check if any data remains
@@ -2,25 +2,16 @@
 -- WARNING: This will delete ALL user data, notes, subscriptions, etc.
 -- Database schema (tables, columns, constraints) will remain intact
 
--- Disable triggers temporarily for faster deletion
-SET session_replication_role = 'replica';
+-- Delete data from all tables in one statement
+-- (a single TRUNCATE empties them together, so foreign key order doesn't matter)
 
--- Delete data from all tables (in correct order to respect foreign keys)
--- Using TRUNCATE CASCADE for efficiency
-
-TRUNCATE TABLE admin_audit_logs CASCADE;
-TRUNCATE TABLE fcm_tokens CASCADE;
-TRUNCATE TABLE subscription_events CASCADE;
-TRUNCATE TABLE sync_events CASCADE;
-TRUNCATE TABLE encrypted_notes CASCADE;
-TRUNCATE TABLE encryption_keys CASCADE;
-TRUNCATE TABLE devices CASCADE;
-TRUNCATE TABLE users CASCADE;
+TRUNCATE TABLE usage_tracking, sync_events, subscription_events, reminders,
+    note_id_migration, folders, fcm_tokens, encryption_keys, encrypted_notes,
+    users, devices, admin_audit_logs
+    RESTART IDENTITY;
 
 -- NOTE: We do NOT delete from alembic_version (migration tracking)
-
--- Re-enable triggers
-SET session_replication_role = 'origin';
+-- NOTE: No need to disable triggers - TRUNCATE fires no ON DELETE triggers
 
 -- Verify deletion
 SELECT 'users' AS table_name, COUNT(*) AS row_count FROM users
@@ -37,6 +28,14 @@ SELECT 'subscription_events', COUNT(*) FROM subscription_events
 UNION ALL
 SELECT 'fcm_tokens', COUNT(*) FROM fcm_tokens
 UNION ALL
-SELECT 'admin_audit_logs', COUNT(*) FROM admin_audit_logs;
+SELECT 'admin_audit_logs', COUNT(*) FROM admin_audit_logs
+UNION ALL
+SELECT 'reminders', COUNT(*) FROM reminders
+UNION ALL
+SELECT 'folders', COUNT(*) FROM folders
+UNION ALL
+SELECT 'usage_tracking', COUNT(*) FROM usage_tracking
+UNION ALL
+SELECT 'note_id_migration', COUNT(*) FROM note_id_migration;
 
 -- All counts should be 0
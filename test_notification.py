@@ -8,27 +8,37 @@ import json
 # Backend URL
 BASE_URL = "http://localhost:8645"
 
+# Shared session: keep-alive connections are reused across requests
+SESSION = requests.Session()
+SESSION.headers.update({"Accept": "application/json"})
+
+# (connect, read) timeouts in seconds so a stuck backend can't hang the test
+TIMEOUT = (3, 10)
+
 def test_notification():
     """Test the notification endpoint"""
     print("🧪 Testing notification endpoint...")
     print(f"URL: {BASE_URL}/api/v1/notifications/test\n")
 
     try:
-        response = requests.post(f"{BASE_URL}/api/v1/notifications/test")
+        response = SESSION.post(f"{BASE_URL}/api/v1/notifications/test", timeout=TIMEOUT)
+
+        # Parse the body once and reuse it
+        data = response.json()
 
         print(f"Status Code: {response.status_code}")
         print(f"\nResponse:")
-        print(json.dumps(response.json(), indent=2))
+        print(json.dumps(data, indent=2))
 
         if response.status_code == 200:
-            data = response.json()
             if data.get("success"):
                 print("\n✅ SUCCESS! Firebase is initialized and working!")
             else:
                 print("\n❌ FAILED!")
                 print(f"Message: {data.get('message')}")
-                if data.get('hint'):
-                    print(f"Hint: {data.get('hint')}")
+                hint = data.get('hint')
+                if hint:
+                    print(f"Hint: {hint}")
         else:
             print(f"\n❌ Request failed with status {response.status_code}")
 